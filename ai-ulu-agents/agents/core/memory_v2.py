@@ -13,11 +13,12 @@ Tier 2: The Vault (Stratejik Hafıza)
 """
 
 import json
+import math
 import os
 import threading
 import time
 import platform
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict, field
 from enum import Enum
@@ -32,6 +33,10 @@ class RepoClass(str, Enum):
     GODFATHER = "godfather"  # Central governance (this repo)
 
 
+# Numeric tier used as the predictive engine's repo_classification feature
+CLASSIFICATION_SCORE = {"unicorn": 3, "muscle": 2, "archive": 1}
+
+
 class DecisionType(str, Enum):
     """Types of strategic decisions"""
     REPO_CLASSIFICATION = "repo_classification"
@@ -54,6 +59,7 @@ class StrategicDecision:
     status: str = "active"  # active, revoked, completed
     revoked_at: Optional[str] = None
     revoked_reason: Optional[str] = None
+    ts_epoch: Optional[int] = None  # timestamp as UTC epoch seconds
 
 
 @dataclass  
@@ -70,6 +76,7 @@ class RepoRole:
     commercial_potential: int = 0  # 0-100
     technical_maturity: int = 0    # 0-100
     strategic_notes: List[str] = field(default_factory=list)
+    classification_score: int = 1
 
 
 @dataclass
@@ -87,6 +94,49 @@ class SystemVision:
     cognitive_depth_target: int = 70
 
 
+# Rolling window sizes used by the predictive engine's features
+RSI_WINDOW = 20
+REPAIR_WINDOW = 30
+
+
+def _push_window(data: Dict[str, Any], name: str, value: float, size: int) -> None:
+    """
+    Push a value into a fixed-size rolling window stored in `data`.
+    
+    Running sums are kept relative to the window's first value (the pivot)
+    so the variance is computed on centred data and stays numerically stable.
+    """
+    window = data.setdefault(f"{name}_window", [])
+    pivot = data.setdefault(f"{name}_window_pivot", value)
+    total = data.get(f"{name}_window_sum", 0.0)
+    total_sq = data.get(f"{name}_window_sumsq", 0.0)
+    
+    shifted = value - pivot
+    window.append(value)
+    total += shifted
+    total_sq += shifted * shifted
+    
+    if len(window) > size:
+        oldest = window.pop(0) - pivot
+        total -= oldest
+        total_sq -= oldest * oldest
+    
+    data[f"{name}_window_sum"] = total
+    data[f"{name}_window_sumsq"] = total_sq
+
+
+def window_stats(data: Dict[str, Any], name: str) -> Optional[Tuple[int, float, float]]:
+    """(count, mean, std) of a rolling window kept by _push_window, or None"""
+    window = data.get(f"{name}_window")
+    if not window:
+        return None
+    n = len(window)
+    pivot = data[f"{name}_window_pivot"]
+    shifted_mean = data[f"{name}_window_sum"] / n
+    variance = data[f"{name}_window_sumsq"] / n - shifted_mean * shifted_mean
+    return n, pivot + shifted_mean, math.sqrt(max(variance, 0.0))
+
+
 class FileLock:
     """Cross-platform file locking for JSON state files"""
     
@@ -213,8 +263,28 @@ class InternalMemory:
                 self._local_cache = data.copy()
                 self._last_read = time.time()
     
-    def record_rsi(self, rsi: float) -> None:
-        """Record RSI value with timestamp for trend analysis"""
+    def load(self, repo: str) -> Dict[str, Any]:
+        """Per-repo state written by record_rsi/record_repair (empty if none recorded)"""
+        return self.load_all([repo])[repo]
+    
+    def load_all(self, repos: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Per-repo state for several repositories from a single read"""
+        per_repo = self._read().get("repos", {})
+        return {repo: per_repo.get(repo, {}) for repo in repos}
+    
+    @staticmethod
+    def _repo_section(data: Dict[str, Any], repo: str) -> Dict[str, Any]:
+        """data["repos"][repo], created on first use"""
+        return data.setdefault("repos", {}).setdefault(repo, {})
+    
+    def record_rsi(self, rsi: float, repo: Optional[str] = None) -> None:
+        """
+        Record RSI value with timestamp for trend analysis
+        
+        With `repo`, the value is also appended to that repo's rsi_history
+        and rolling window, which is what the predictive engine reads via
+        load()/load_all().
+        """
         data = self._read()
         history = data.get("rsi_history", [])
         history.append({
@@ -223,8 +293,39 @@ class InternalMemory:
         })
         # Keep last 1000 readings
         data["rsi_history"] = history[-1000:]
+        if repo:
+            section = self._repo_section(data, repo)
+            section["rsi_history"] = (section.get("rsi_history", []) + [float(rsi)])[-1000:]
+            _push_window(section, "rsi", float(rsi), RSI_WINDOW)
+        self._write(data)
+    
+    def record_repair(self, duration_minutes: float, repo: Optional[str] = None) -> None:
+        """Record a repair duration (minutes), also under `repo` when given"""
+        data = self._read()
+        stats = data.setdefault("stats", {})
+        stats["repairs"] = int(stats.get("repairs", 0)) + 1
+        repair_times = list(stats.get("repair_times", []))
+        repair_times.append(float(duration_minutes))
+        stats["repair_times"] = repair_times[-100:]
+        stats["total_time"] = float(stats.get("total_time", 0.0)) + float(duration_minutes)
+        if repo:
+            section = self._repo_section(data, repo)
+            section["repair_times"] = (section.get("repair_times", []) + [float(duration_minutes)])[-100:]
+            _push_window(section, "repair", float(duration_minutes), REPAIR_WINDOW)
         self._write(data)
     
+    def get_rsi_volatility(self, repo: str) -> float:
+        """Standard deviation of a repo's last RSI_WINDOW readings (0.0 until the window is full)"""
+        stats = window_stats(self.load(repo), "rsi")
+        if stats is None or stats[0] < RSI_WINDOW:
+            return 0.0
+        return stats[2]
+    
+    def get_avg_repair_time(self, repo: str, default: float = 4.0) -> float:
+        """Mean of a repo's last REPAIR_WINDOW repair durations"""
+        stats = window_stats(self.load(repo), "repair")
+        return stats[1] if stats else default
+    
     def get_rsi_trend(self, hours: int = 24) -> Dict[str, Any]:
         """Get RSI trend analysis"""
         data = self._read()
@@ -351,19 +452,25 @@ class TheVault:
             with open(self.VAULT_PATH, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
     
+    def load(self) -> Dict[str, Any]:
+        """Full vault document (vision, decisions newest first, repo_roles)"""
+        return self._read()
+    
     def record_decision(self, decision_type: DecisionType, target: str, 
                        decision: str, reasoning: str, expected_outcome: str) -> str:
         """Record a strategic decision by GodFather"""
         data = self._read()
+        now = datetime.utcnow()
         
         dec = StrategicDecision(
-            id=f"dec_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{target}",
-            timestamp=datetime.utcnow().isoformat() + "Z",
+            id=f"dec_{now.strftime('%Y%m%d%H%M%S')}_{target}",
+            timestamp=now.isoformat() + "Z",
             decision_type=decision_type,
             target=target,
             decision=decision,
             reasoning=reasoning,
-            expected_outcome=expected_outcome
+            expected_outcome=expected_outcome,
+            ts_epoch=int(now.replace(tzinfo=timezone.utc).timestamp())
         )
         
         data["decisions"].insert(0, asdict(dec))
@@ -389,7 +496,8 @@ class TheVault:
             description=kwargs.get("description", ""),
             commercial_potential=kwargs.get("commercial_potential", 0),
             technical_maturity=kwargs.get("technical_maturity", 0),
-            strategic_notes=kwargs.get("strategic_notes", [])
+            strategic_notes=kwargs.get("strategic_notes", []),
+            classification_score=CLASSIFICATION_SCORE.get(role.value, 1)
         )
         
         data["repo_roles"][repo_name] = asdict(repo_role)
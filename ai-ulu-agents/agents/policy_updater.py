@@ -1,6 +1,8 @@
 import argparse
 import json
 import os
+
+import orjson
 from typing import Dict, Any, List, Set
 
 
@@ -8,16 +10,19 @@ def read_json(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
     if not os.path.exists(path):
         return default
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except (OSError, json.JSONDecodeError):
         return default
 
 
 def write_json(path: str, data: Dict[str, Any]) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Write beside the target and rename, so readers never see a partial file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    os.replace(tmp_path, path)
 
 
 def apply_class_change(
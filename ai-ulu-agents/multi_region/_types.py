@@ -0,0 +1,233 @@
+"""
+AI-ULU Multi-Region shared types
+Region, task and CRDT state definitions used by the orchestrators
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set
+from dataclasses import dataclass, asdict
+from enum import Enum
+import orjson
+
+
+class RegionStatus(Enum):
+    UNKNOWN = "unknown"
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"
+    OFFLINE = "offline"
+    MAINTENANCE = "maintenance"
+
+
+@dataclass(slots=True)
+class Region:
+    """Represents a deployment region"""
+    id: str
+    name: str
+    location: str
+    endpoint: str
+    websocket_url: str
+    status: RegionStatus = RegionStatus.UNKNOWN
+    latency_ms: float = 0.0
+    last_heartbeat: Optional[datetime] = None
+    active_agents: int = 0
+    load_factor: float = 0.0  # 0.0 - 1.0
+    
+    def __post_init__(self):
+        # Configs store the status by value
+        if not isinstance(self.status, RegionStatus):
+            self.status = RegionStatus(self.status)
+    
+    def to_dict(self) -> Dict:
+        return {
+            **asdict(self),
+            'status': self.status.value,
+            'last_heartbeat': self.last_heartbeat.isoformat() if self.last_heartbeat else None
+        }
+
+
+@dataclass(slots=True)
+class GlobalTask:
+    """A task that can be distributed across regions"""
+    id: str
+    type: str
+    payload: Dict[str, Any]
+    priority: int = 5  # 1-10
+    preferred_regions: List[str] = None
+    required_regions: List[str] = None  # Must run in all these regions
+    created_at: datetime = None
+    
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+        if self.preferred_regions is None:
+            self.preferred_regions = []
+        if self.required_regions is None:
+            self.required_regions = []
+
+
+class CRDTState:
+    """
+    Conflict-free Replicated Data Type for state sync
+    across regions without conflicts
+    
+    Entries are also hashed into a bucketed Merkle tree (MERKLE_BUCKETS
+    buckets by first byte of the key's SHA-256) so two replicas can compare
+    a single root hash and only exchange the buckets that differ. Leaf
+    hashes are computed lazily, when root_hash()/bucket_hashes() is called,
+    so writes only mark their key dirty.
+    """
+    
+    MERKLE_BUCKETS = 256
+    
+    __slots__ = ('state', 'timestamps', 'vector_clock', '_leaf_hashes', '_bucket_hashes', '_dirty', '_root')
+    
+    def __init__(self):
+        self.state: Dict[str, Any] = {}
+        self.timestamps: Dict[str, datetime] = {}
+        self.vector_clock: Dict[str, int] = {}
+        self._leaf_hashes: Dict[str, int] = {}
+        self._bucket_hashes: List[int] = [0] * self.MERKLE_BUCKETS
+        self._dirty: Set[str] = set()  # keys written since their leaf was last hashed
+        self._root: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CRDTState':
+        """Build a state from its to_dict() form"""
+        state = cls()
+        timestamps = data.get('timestamps', {})
+        for key, value in data.get('state', {}).items():
+            ts = timestamps.get(key)
+            state._set(key, value, datetime.fromisoformat(ts) if ts else datetime.min)
+        state.vector_clock = dict(data.get('vector_clock', {}))
+        return state
+    
+    @staticmethod
+    def _bucket_of(key: str) -> int:
+        return hashlib.sha256(key.encode()).digest()[0]
+    
+    @staticmethod
+    def _leaf_bytes(key: str, value: Any, timestamp: datetime) -> bytes:
+        """Canonical encoding of an entry for its leaf hash; accepts any value the state can hold"""
+        entry = [key, value, timestamp.isoformat()]
+        try:
+            return orjson.dumps(entry, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+        # orjson rejects e.g. integers beyond 64 bits; the stdlib encoder does not
+        try:
+            return json.dumps(entry, sort_keys=True, default=str, separators=(',', ':')).encode()
+        except TypeError:
+            # Keys of mixed types cannot be sorted
+            return repr(entry).encode()
+    
+    def _set(self, key: str, value: Any, timestamp: datetime):
+        """Store an entry; its leaf hash is refreshed on the next root_hash()/bucket_hashes()"""
+        self.state[key] = value
+        self.timestamps[key] = timestamp
+        self._dirty.add(key)
+        self._root = None
+    
+    def _flush_leaves(self):
+        """Rehash dirty entries and fold them into their buckets"""
+        leaf_hashes = self._leaf_hashes
+        bucket_hashes = self._bucket_hashes
+        for key in self._dirty:
+            leaf = int.from_bytes(hashlib.sha256(
+                self._leaf_bytes(key, self.state[key], self.timestamps[key])
+            ).digest(), 'big')
+            # Bucket digest is the XOR of its leaves, so replacing a leaf is O(1)
+            bucket_hashes[self._bucket_of(key)] ^= leaf_hashes.get(key, 0) ^ leaf
+            leaf_hashes[key] = leaf
+        self._dirty.clear()
+    
+    def update(self, key: str, value: Any, region_id: str, timestamp: datetime):
+        """Update with conflict resolution (last-write-wins)"""
+        current_ts = self.timestamps.get(key)
+        
+        if current_ts is None or timestamp > current_ts:
+            self._set(key, value, timestamp)
+            
+            # Update vector clock
+            self.vector_clock[region_id] = self.vector_clock.get(region_id, 0) + 1
+            
+            return True
+        
+        return False  # Conflict: older timestamp
+    
+    def get(self, key: str) -> Any:
+        return self.state.get(key)
+    
+    def merge(self, other: 'CRDTState') -> 'CRDTState':
+        """Merge two CRDT states"""
+        # Copy our side wholesale, then only walk the other side's keys
+        merged = CRDTState()
+        merged.state = dict(self.state)
+        merged.timestamps = dict(self.timestamps)
+        merged.vector_clock = dict(self.vector_clock)
+        merged._leaf_hashes = dict(self._leaf_hashes)
+        merged._bucket_hashes = list(self._bucket_hashes)
+        merged._dirty = set(self._dirty)
+        merged._root = self._root
+        return merged.absorb(other)
+    
+    def absorb(self, other: 'CRDTState') -> 'CRDTState':
+        """Merge another CRDT state into this one in place (same rules as merge)"""
+        # Bind lookups to locals; this loop runs once per key per sync
+        get_ts = self.timestamps.get
+        get_other_ts = other.timestamps.get
+        oldest = datetime.min
+        
+        for key, value in other.state.items():
+            other_ts = get_other_ts(key, oldest)
+            if other_ts > get_ts(key, oldest):
+                self._set(key, value, other_ts)
+        
+        vector_clock = self.vector_clock
+        for region, count in other.vector_clock.items():
+            if count > vector_clock.get(region, 0):
+                vector_clock[region] = count
+        
+        return self
+    
+    def root_hash(self) -> str:
+        """Merkle root over all bucket digests"""
+        if self._root is None:
+            self._flush_leaves()
+            self._root = hashlib.sha256(
+                b''.join(h.to_bytes(32, 'big') for h in self._bucket_hashes)
+            ).hexdigest()
+        return self._root
+    
+    def bucket_hashes(self) -> List[str]:
+        """Hex digest of every bucket, indexed by bucket number"""
+        self._flush_leaves()
+        return [format(h, '064x') for h in self._bucket_hashes]
+    
+    def mismatched_buckets(self, remote_hashes: List[str]) -> List[int]:
+        """Buckets whose digest differs from a remote replica's (all of them if the layouts differ)"""
+        local_hashes = self.bucket_hashes()
+        if len(remote_hashes) != len(local_hashes):
+            # Empty/short lists come from error bodies or older peers; pull everything
+            return list(range(len(local_hashes)))
+        return [
+            i for i, (local, remote) in enumerate(zip(local_hashes, remote_hashes))
+            if local != remote
+        ]
+    
+    def bucket_to_dict(self, bucket: int) -> Dict:
+        """to_dict() restricted to the keys of one bucket"""
+        keys = [k for k in self.state if self._bucket_of(k) == bucket]
+        return {
+            'state': {k: self.state[k] for k in keys},
+            'timestamps': {k: self.timestamps[k].isoformat() for k in keys},
+            'vector_clock': self.vector_clock
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'timestamps': {k: v.isoformat() for k, v in self.timestamps.items()},
+            'vector_clock': self.vector_clock
+        }
@@ -4,123 +4,38 @@ Global distributed orchestration with auto-failover
 """
 
 import asyncio
+import gzip
 import json
 import hashlib
+import random
+import sys
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Set, Tuple
 from pathlib import Path
 import logging
 import aiohttp
+import msgspec
+import orjson
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+if not __package__:
+    # Allow running as a script: python ai-ulu-agents/multi_region/orchestrator.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from multi_region._types import CRDTState, GlobalTask, Region, RegionStatus
 
-@dataclass
-class Region:
-    """Represents a deployment region"""
-    id: str
-    name: str
-    location: str
-    endpoint: str
-    websocket_url: str
-    status: str = "unknown"  # healthy, degraded, offline
-    latency_ms: float = 0.0
-    last_heartbeat: Optional[datetime] = None
-    active_agents: int = 0
-    load_factor: float = 0.0  # 0.0 - 1.0
-    
-    def to_dict(self) -> Dict:
-        return {
-            **asdict(self),
-            'last_heartbeat': self.last_heartbeat.isoformat() if self.last_heartbeat else None
-        }
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
-@dataclass
-class GlobalTask:
-    """A task that can be distributed across regions"""
+class TaskWire(msgspec.Struct):
+    """Wire format for tasks sent to a region"""
     id: str
     type: str
     payload: Dict[str, Any]
-    priority: int = 5  # 1-10
-    preferred_regions: List[str] = None
-    required_regions: List[str] = None  # Must run in all these regions
-    created_at: datetime = None
-    
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.utcnow()
-        if self.preferred_regions is None:
-            self.preferred_regions = []
-        if self.required_regions is None:
-            self.required_regions = []
+    priority: int
 
 
-class CRDTState:
-    """
-    Conflict-free Replicated Data Type for state sync
-    across regions without conflicts
-    """
-    
-    def __init__(self):
-        self.state: Dict[str, Any] = {}
-        self.timestamps: Dict[str, datetime] = {}
-        self.vector_clock: Dict[str, int] = {}
-    
-    def update(self, key: str, value: Any, region_id: str, timestamp: datetime):
-        """Update with conflict resolution (last-write-wins)"""
-        current_ts = self.timestamps.get(key)
-        
-        if current_ts is None or timestamp > current_ts:
-            self.state[key] = value
-            self.timestamps[key] = timestamp
-            
-            # Update vector clock
-            self.vector_clock[region_id] = self.vector_clock.get(region_id, 0) + 1
-            
-            return True
-        
-        return False  # Conflict: older timestamp
-    
-    def get(self, key: str) -> Any:
-        return self.state.get(key)
-    
-    def merge(self, other: 'CRDTState') -> 'CRDTState':
-        """Merge two CRDT states"""
-        merged = CRDTState()
-        
-        # Merge state
-        all_keys = set(self.state.keys()) | set(other.state.keys())
-        
-        for key in all_keys:
-            self_ts = self.timestamps.get(key, datetime.min)
-            other_ts = other.timestamps.get(key, datetime.min)
-            
-            if self_ts >= other_ts:
-                merged.state[key] = self.state.get(key)
-                merged.timestamps[key] = self_ts
-            else:
-                merged.state[key] = other.state.get(key)
-                merged.timestamps[key] = other_ts
-        
-        # Merge vector clocks (take max)
-        all_regions = set(self.vector_clock.keys()) | set(other.vector_clock.keys())
-        for region in all_regions:
-            merged.vector_clock[region] = max(
-                self.vector_clock.get(region, 0),
-                other.vector_clock.get(region, 0)
-            )
-        
-        return merged
-    
-    def to_dict(self) -> Dict:
-        return {
-            'state': self.state,
-            'timestamps': {k: v.isoformat() for k, v in self.timestamps.items()},
-            'vector_clock': self.vector_clock
-        }
+_task_encoder = msgspec.json.Encoder()
 
 
 class MultiRegionOrchestrator:
@@ -143,11 +58,25 @@ class MultiRegionOrchestrator:
         self.primary_region: Optional[str] = None
         
         self.heartbeat_interval = 30  # seconds
+        self.heartbeat_jitter = 3  # seconds, spreads probes across regions
         self.sync_interval = 60  # seconds
         self.failover_threshold = 3  # consecutive failures
         
         self.region_failures: Dict[str, int] = {}
         
+        # Healthy regions ordered by routing score (lower is better)
+        self._healthy_by_score: List[Tuple[float, str]] = []
+        
+        # Routing decisions keyed by preferred regions; cleared by
+        # _rebuild_region_index whenever region health changes
+        self._best_region_cache: Dict[Tuple[str, ...], Optional[str]] = {}
+        
+        # Vector clock of the last state successfully pushed to each region
+        self._last_pushed_vc: Dict[str, Dict[str, int]] = {}
+        
+        # Shared HTTP session so region connections are pooled and reused
+        self._session: Optional[aiohttp.ClientSession] = None
+        
         self._load_config()
     
     def _load_config(self):
@@ -193,6 +122,17 @@ class MultiRegionOrchestrator:
                 'regions': [r.to_dict() for r in self.regions.values()]
             }, f, indent=2)
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
     async def start(self):
         """Start the multi-region orchestrator"""
         logger.info("🌍 Multi-Region Orchestrator starting...")
@@ -206,10 +146,27 @@ class MultiRegionOrchestrator:
         )
     
     async def _heartbeat_loop(self):
-        """Continuously check region health"""
+        """Continuously check region health, one staggered loop per region"""
+        await asyncio.gather(*[
+            asyncio.create_task(self._region_heartbeat(region))
+            for region in self.regions.values()
+        ])
+    
+    async def _region_heartbeat(self, region: Region):
+        """Probe a single region on its own jittered schedule"""
+        # Stagger the first probe so regions don't all fire together
+        await asyncio.sleep(random.uniform(0, self.heartbeat_jitter))
         while True:
-            await self._check_all_regions()
-            await asyncio.sleep(self.heartbeat_interval)
+            await self._check_region(region)
+            await asyncio.sleep(self._next_heartbeat_delay(region))
+    
+    def _next_heartbeat_delay(self, region: Region) -> float:
+        """Delay before the next probe: jittered interval, or fast backoff while failing"""
+        failures = self.region_failures.get(region.id, 0)
+        if failures:
+            # Exponential backoff (1s, 2s, 4s, ...) so degrading regions are probed faster
+            return float(min(2 ** (failures - 1), self.heartbeat_interval))
+        return max(0.0, self.heartbeat_interval + random.uniform(-self.heartbeat_jitter, self.heartbeat_jitter))
     
     async def _check_all_regions(self):
         """Check health of all regions"""
@@ -221,36 +178,50 @@ class MultiRegionOrchestrator:
         try:
             start = datetime.utcnow()
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{region.endpoint}/health",
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        region.status = "healthy"
-                        region.latency_ms = (datetime.utcnow() - start).total_seconds() * 1000
-                        region.last_heartbeat = datetime.utcnow()
-                        region.active_agents = data.get('active_agents', 0)
-                        region.load_factor = data.get('load_factor', 0.0)
-                        
-                        # Reset failure count
-                        self.region_failures[region.id] = 0
-                        
-                        logger.debug(f"✅ {region.id}: healthy ({region.latency_ms:.0f}ms)")
-                    else:
-                        raise Exception(f"HTTP {response.status}")
+            async with self._get_session().get(
+                f"{region.endpoint}/health",
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    
+                    region.status = RegionStatus.HEALTHY
+                    region.latency_ms = (datetime.utcnow() - start).total_seconds() * 1000
+                    region.last_heartbeat = datetime.utcnow()
+                    region.active_agents = data.get('active_agents', 0)
+                    region.load_factor = data.get('load_factor', 0.0)
+                    
+                    # Reset failure count
+                    self.region_failures[region.id] = 0
+                    
+                    logger.debug(f"✅ {region.id}: healthy ({region.latency_ms:.0f}ms)")
+                else:
+                    raise Exception(f"HTTP {response.status}")
                         
         except Exception as e:
             self.region_failures[region.id] = self.region_failures.get(region.id, 0) + 1
             
             if self.region_failures[region.id] >= self.failover_threshold:
-                region.status = "offline"
+                region.status = RegionStatus.OFFLINE
                 logger.error(f"❌ {region.id}: MARKED OFFLINE ({self.region_failures[region.id]} failures)")
             else:
-                region.status = "degraded"
+                region.status = RegionStatus.DEGRADED
                 logger.warning(f"⚠️ {region.id}: degraded ({self.region_failures[region.id]} failures)")
+        
+        self._rebuild_region_index()
+    
+    @staticmethod
+    def _region_score(region: Region) -> float:
+        """Routing score: lower is better"""
+        return region.latency_ms * 0.5 + region.load_factor * 1000 * 0.5
+    
+    def _rebuild_region_index(self):
+        """Re-rank healthy regions by routing score"""
+        self._healthy_by_score = sorted(
+            (self._region_score(r), r.id)
+            for r in self.regions.values() if r.status == RegionStatus.HEALTHY
+        )
+        self._best_region_cache.clear()
     
     async def _sync_loop(self):
         """Continuously sync state across regions"""
@@ -260,7 +231,7 @@ class MultiRegionOrchestrator:
     
     async def _sync_state(self):
         """Sync global state across all healthy regions"""
-        healthy_regions = [r for r in self.regions.values() if r.status == "healthy"]
+        healthy_regions = [r for r in self.regions.values() if r.status == RegionStatus.HEALTHY]
         
         if len(healthy_regions) < 2:
             return  # Not enough regions to sync
@@ -269,53 +240,74 @@ class MultiRegionOrchestrator:
         
         # Gather state from all regions
         remote_states = []
+        remote_clocks: Dict[str, Dict[str, int]] = {}
         for region in healthy_regions:
             try:
                 state = await self._fetch_region_state(region)
                 remote_states.append(state)
+                remote_clocks[region.id] = state.vector_clock
             except Exception as e:
                 logger.warning(f"⚠️ Failed to fetch state from {region.id}: {e}")
         
-        # Merge all states
+        # Merge all states into the global state in place
         merged = self.global_state
         for state in remote_states:
-            merged = merged.merge(state)
+            merged.absorb(state)
         
-        self.global_state = merged
-        
-        # Push merged state to all regions
+        # Push merged state to regions that don't already have it
         for region in healthy_regions:
+            known_vc = remote_clocks.get(region.id, self._last_pushed_vc.get(region.id))
+            if known_vc == merged.vector_clock:
+                continue
             try:
                 await self._push_state_to_region(region, merged)
+                self._last_pushed_vc[region.id] = dict(merged.vector_clock)
             except Exception as e:
                 logger.warning(f"⚠️ Failed to push state to {region.id}: {e}")
         
         logger.info(f"✅ State synced: {len(merged.state)} keys")
     
     async def _fetch_region_state(self, region: Region) -> CRDTState:
-        """Fetch state from a region"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{region.endpoint}/state") as response:
-                data = await response.json()
-                
-                state = CRDTState()
-                state.state = data.get('state', {})
-                state.vector_clock = data.get('vector_clock', {})
-                # Parse timestamps
-                for k, v in data.get('timestamps', {}).items():
-                    state.timestamps[k] = datetime.fromisoformat(v)
-                
-                return state
+        """Fetch the parts of a region's state that differ from ours"""
+        local = self.global_state
+        session = self._get_session()
+        
+        # Compare Merkle roots first; matching roots mean nothing to pull
+        async with session.get(f"{region.endpoint}/state/root") as response:
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status}")
+            root = orjson.loads(await response.read())
+        
+        state = CRDTState()
+        state.vector_clock = dict(root.get('vector_clock', {}))
+        if root.get('root') == local.root_hash():
+            return state
+        
+        async with session.get(f"{region.endpoint}/state/buckets") as response:
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status}")
+            remote_buckets = orjson.loads(await response.read()).get('buckets', [])
+        
+        # Only pull the buckets whose digests differ
+        for bucket in local.mismatched_buckets(remote_buckets):
+            async with session.get(f"{region.endpoint}/state/bucket/{bucket}") as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                state.absorb(CRDTState.from_dict(orjson.loads(await response.read())))
+        
+        return state
     
     async def _push_state_to_region(self, region: Region, state: CRDTState):
         """Push state to a region"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{region.endpoint}/state",
-                json=state.to_dict()
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP {response.status}")
+        # State keys repeat heavily, so even the fastest gzip level shrinks it a lot
+        body = gzip.compress(orjson.dumps(state.to_dict()), compresslevel=1)
+        async with self._get_session().post(
+            f"{region.endpoint}/state",
+            data=body,
+            headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json'}
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status}")
     
     async def _failover_monitor(self):
         """Monitor for failovers and rebalance"""
@@ -325,8 +317,8 @@ class MultiRegionOrchestrator:
     
     async def _check_failovers(self):
         """Check if any regions need failover"""
-        offline_regions = [r for r in self.regions.values() if r.status == "offline"]
-        healthy_regions = [r for r in self.regions.values() if r.status == "healthy"]
+        offline_regions = [r for r in self.regions.values() if r.status == RegionStatus.OFFLINE]
+        healthy_regions = [r for r in self.regions.values() if r.status == RegionStatus.HEALTHY]
         
         if not offline_regions:
             return
@@ -348,34 +340,44 @@ class MultiRegionOrchestrator:
         # In production, this would fetch active tasks from the failed region
         # and redistribute them
         
+        # Least loaded healthy region; loads don't change while we reroute
+        target = min(to_regions, key=lambda r: r.load_factor)
+        
         # Update routing table
         for task_id, task in self.active_tasks.items():
             if from_region.id in task.preferred_regions:
-                # Pick least loaded healthy region
-                target = min(to_regions, key=lambda r: r.load_factor)
                 task.preferred_regions = [target.id]
                 
                 logger.info(f"   Task {task_id} -> {target.id}")
     
     def get_best_region(self, task: GlobalTask) -> Optional[Region]:
         """Get best region for a task based on latency and load"""
-        candidates = []
-        
-        for region_id in task.preferred_regions or self.regions.keys():
+        cache_key = tuple(task.preferred_regions or ())
+        if cache_key in self._best_region_cache:
+            region_id = self._best_region_cache[cache_key]
+            return self.regions.get(region_id) if region_id else None
+        
+        region = self._pick_best_region(task)
+        self._best_region_cache[cache_key] = region.id if region else None
+        return region
+    
+    def _pick_best_region(self, task: GlobalTask) -> Optional[Region]:
+        """Uncached routing decision for get_best_region"""
+        preferred = set(task.preferred_regions) if task.preferred_regions else None
+        
+        # Index is ordered by score, so the first eligible entry wins
+        for _, region_id in self._healthy_by_score:
+            if preferred is not None and region_id not in preferred:
+                continue
             region = self.regions.get(region_id)
-            if region and region.status == "healthy":
-                # Score: lower is better
-                score = region.latency_ms * 0.5 + region.load_factor * 1000 * 0.5
-                candidates.append((region, score))
-        
-        if not candidates:
-            # Fallback to any healthy region
-            healthy = [r for r in self.regions.values() if r.status == "healthy"]
-            if healthy:
-                return min(healthy, key=lambda r: r.load_factor)
-            return None
+            if region and region.status == RegionStatus.HEALTHY:
+                return region
         
-        return min(candidates, key=lambda x: x[1])[0]
+        # Fallback to any healthy region
+        healthy = [r for r in self.regions.values() if r.status == RegionStatus.HEALTHY]
+        if healthy:
+            return min(healthy, key=lambda r: r.load_factor)
+        return None
     
     async def distribute_task(self, task: GlobalTask) -> Dict[str, Any]:
         """Distribute a task to appropriate region(s)"""
@@ -389,7 +391,7 @@ class MultiRegionOrchestrator:
         if task.required_regions:
             for region_id in task.required_regions:
                 region = self.regions.get(region_id)
-                if region and region.status == "healthy":
+                if region and region.status == RegionStatus.HEALTHY:
                     result = await self._send_task_to_region(task, region)
                     results[region_id] = result
                 else:
@@ -412,17 +414,15 @@ class MultiRegionOrchestrator:
     async def _send_task_to_region(self, task: GlobalTask, region: Region) -> Dict:
         """Send task to specific region"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{region.endpoint}/tasks",
-                    json={
-                        'id': task.id,
-                        'type': task.type,
-                        'payload': task.payload,
-                        'priority': task.priority
-                    }
-                ) as response:
-                    return await response.json()
+            data = _task_encoder.encode(
+                TaskWire(task.id, task.type, task.payload, task.priority)
+            )
+            async with self._get_session().post(
+                f"{region.endpoint}/tasks",
+                data=data,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                return orjson.loads(await response.read())
         except Exception as e:
             logger.error(f"❌ Failed to send task to {region.id}: {e}")
             return {"error": str(e)}
@@ -447,8 +447,9 @@ class MultiRegionOrchestrator:
         region = self.regions.get(region_id)
         if region:
             logger.warning(f"🚨 EMERGENCY FAILOVER: {region_id}")
-            region.status = "offline"
-            healthy = [r for r in self.regions.values() if r.status == "healthy"]
+            region.status = RegionStatus.OFFLINE
+            self._rebuild_region_index()
+            healthy = [r for r in self.regions.values() if r.status == RegionStatus.HEALTHY]
             await self._redistribute_tasks(region, healthy)
 
 
@@ -493,7 +494,7 @@ class GlobalLoadBalancer:
         
         candidates = [
             rid for rid in self.orchestrator.regions.keys()
-            if rid not in exclude and self.orchestrator.regions[rid].status == "healthy"
+            if rid not in exclude and self.orchestrator.regions[rid].status == RegionStatus.HEALTHY
         ]
         
         if not candidates:
@@ -506,9 +507,7 @@ class GlobalLoadBalancer:
 if __name__ == "__main__":
     import sys
     
-    async def main():
-        orchestrator = MultiRegionOrchestrator()
-        
+    async def run(orchestrator: MultiRegionOrchestrator):
         if len(sys.argv) > 1:
             command = sys.argv[1]
             
@@ -532,4 +531,12 @@ if __name__ == "__main__":
             # Start orchestrator
             await orchestrator.start()
     
+    async def main():
+        orchestrator = MultiRegionOrchestrator()
+        
+        try:
+            await run(orchestrator)
+        finally:
+            await orchestrator.close()
+    
     asyncio.run(main())
@@ -1,38 +0,0 @@
-"""
-AI-ULU Multi-Region Orchestration (Phase 11)
-Global deployment with cross-region state sync
-"""
-
-import asyncio
-import json
-import hashlib
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-from enum import Enum
-import logging
-import aiohttp
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-class RegionStatus(Enum):
-    HEALTHY = "healthy"
-    DEGRADED = "degraded"
-    DOWN = "down"
-    MAINTENANCE = "maintenance"
-
-
-@dataclass
-class Region:
-    """Represents a deployment region"""
-    id: str
-    name: str
-    location: str
-    endpoint: str
-    websocket_url: str
-    status: RegionStatus = RegionStatus.HEALTHY
-    latency_ms: float = 0.0
-    load_percentage: float = 0.0
-    last_heartbeat: Optional[datetime] = None
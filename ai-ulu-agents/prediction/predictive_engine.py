@@ -3,20 +3,70 @@ AI-ULU Predictive Engine (Phase 6)
 ML-based failure prediction and auto-remediation
 """
 
-import json
+import hashlib
+import math
+import os
+import pickle
+import sys
+import time
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import logging
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-import joblib
+import orjson
+
+if not __package__:
+    # Allow running as a script: python ai-ulu-agents/prediction/predictive_engine.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.core.memory_v2 import CLASSIFICATION_SCORE, REPAIR_WINDOW, RSI_WINDOW, UnifiedMemory, window_stats
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fixed feature layout shared by extract_features, the scoring matrix and training
+FEATURE_ORDER = (
+    "rsi_current", "rsi_trend", "rsi_volatility",
+    "avg_mttr", "mttr_trend", "repair_frequency",
+    "chaos_success_rate", "total_chaos_tests",
+    "repo_classification", "decision_frequency",
+    "hour_of_day", "day_of_week",
+)
+(RSI_CURRENT, RSI_TREND, RSI_VOLATILITY,
+ AVG_MTTR, MTTR_TREND, REPAIR_FREQUENCY,
+ CHAOS_SUCCESS_RATE, TOTAL_CHAOS_TESTS,
+ REPO_CLASSIFICATION, DECISION_FREQUENCY,
+ HOUR_OF_DAY, DAY_OF_WEEK) = range(len(FEATURE_ORDER))
+
+# Risk factor messages, indexed by bit position in the risk factor mask
+RISK_FACTORS = (
+    "Low RSI (instability detected)",
+    "Declining RSI trend",
+    "Increasing repair times",
+    "Poor chaos test performance",
+    "High decision frequency (unstable)",
+)
+# Per factor: feature column, threshold and direction (+1 fires above, -1 below)
+_RF_IDX = np.array([RSI_CURRENT, RSI_TREND, MTTR_TREND, CHAOS_SUCCESS_RATE, DECISION_FREQUENCY])
+_RF_THR = np.array([80, -0.5, 0.5, 0.8, 5], dtype=np.float64)
+_RF_DIR = np.array([-1, -1, 1, -1, 1], dtype=np.int8)
+_RF_BIT = (1 << np.arange(len(RISK_FACTORS))).astype(np.uint16)
+
+
+def _iso_to_epoch(timestamp: str) -> float:
+    """Parse an ISO timestamp (naive values are UTC) to epoch seconds"""
+    dt = datetime.fromisoformat(timestamp.replace("Z", ""))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _epoch_to_iso(epoch: float) -> str:
+    """Naive UTC ISO timestamp, the format predictions and remediations are stored in"""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
 
 class PredictiveEngine:
     """
@@ -28,35 +78,73 @@ class PredictiveEngine:
     - RSI trend forecasting
     """
     
+    FEATURE_ORDER = FEATURE_ORDER
+    
+    _ACTIONS = {
+        "critical": "immediate_proactive_maintenance",
+        "high": "schedule_maintenance",
+        "medium": "increase_monitoring",
+        "low": "continue_normal_ops"
+    }
+    
     def __init__(self, model_dir: str = "ai-ulu-agents/prediction/models"):
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
         
         self.failure_classifier = None
         self.mttr_regressor = None
-        self.scaler = StandardScaler()
+        self.scaler = None
+        
+        # Fitted scaler parameters, applied inline instead of scaler.transform
+        self._sc_mean: Optional[np.ndarray] = None
+        self._sc_scale: Optional[np.ndarray] = None
+        
+        # ONNX Runtime session for non-linear failure classifiers (sklearn object is training-only)
+        self._onnx_sess: Optional["ort.InferenceSession"] = None
+        
+        # Linear classifier weights with the scaler folded in (raw features -> logit)
+        self._lr_w: Optional[np.ndarray] = None
+        self._lr_b: float = 0.0
+        
+        # Digest of the last predictions written to latest_predictions.json
+        self._last_predictions_digest: Optional[bytes] = None
+        
+        # Scratch row for single-repo feature extraction
+        self._scratch = np.empty((1, len(FEATURE_ORDER)), dtype=np.float64)
         
         self._load_or_init_models()
     
     def _load_or_init_models(self):
         """Load existing models or initialize new ones"""
+        # sklearn is only needed once an engine is built; keep it off the module import path
+        from sklearn.ensemble import GradientBoostingRegressor
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.preprocessing import StandardScaler
+        
+        self.scaler = StandardScaler()
         failure_model_path = self.model_dir / "failure_classifier.pkl"
         mttr_model_path = self.model_dir / "mttr_regressor.pkl"
         scaler_path = self.model_dir / "scaler.pkl"
+        scaler_params_path = self.model_dir / "scaler_params.npy"
+        onnx_path = self.model_dir / "failure_classifier.onnx"
         
         if failure_model_path.exists():
-            self.failure_classifier = joblib.load(failure_model_path)
+            self.failure_classifier = self._load_artifact(failure_model_path)
+            # Older forest models: scoring is a handful of rows, a worker pool costs more than it saves
+            if hasattr(self.failure_classifier, "n_jobs"):
+                self.failure_classifier.n_jobs = 1
             logger.info("✅ Loaded failure prediction model")
         else:
-            self.failure_classifier = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
+            # ~12 features: a linear model scores with one dot product per repo
+            self.failure_classifier = LogisticRegression(
+                C=1.0,
+                max_iter=1000,
                 random_state=42
             )
             logger.info("🆕 Initialized new failure classifier")
         
         if mttr_model_path.exists():
-            self.mttr_regressor = joblib.load(mttr_model_path)
+            self.mttr_regressor = self._load_artifact(mttr_model_path)
             logger.info("✅ Loaded MTTR prediction model")
         else:
             self.mttr_regressor = GradientBoostingRegressor(
@@ -66,26 +154,132 @@ class PredictiveEngine:
             )
             logger.info("🆕 Initialized new MTTR regressor")
         
-        if scaler_path.exists():
-            self.scaler = joblib.load(scaler_path)
+        if scaler_params_path.exists():
+            # Scoring only needs mean/scale; map them instead of unpickling the scaler
+            self._sc_mean, self._sc_scale = np.load(scaler_params_path, mmap_mode="r")
+        elif scaler_path.exists():
+            self.scaler = self._load_artifact(scaler_path)
+            self._cache_scaler_params()
+        
+        self._cache_linear_params()
+        
+        # Linear models score natively; ONNX Runtime is only loaded for anything else
+        if self._lr_w is None and onnx_path.exists():
+            self._load_onnx(onnx_path)
+    
+    @staticmethod
+    def _load_artifact(path: Path):
+        """Unpickle a model artifact, falling back to joblib for older dumps"""
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            import joblib
+            return joblib.load(path)
+    
+    @staticmethod
+    def _dump_artifact(obj, path: Path):
+        """Pickle a model artifact with protocol 5"""
+        with open(path, "wb") as f:
+            pickle.dump(obj, f, protocol=5)
+    
+    def _load_onnx(self, path: Path):
+        """Open an ONNX Runtime session for the exported failure classifier"""
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self._onnx_sess = ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+        logger.info("✅ Loaded ONNX failure classifier")
+    
+    def _export_onnx(self, n_features: int):
+        """Export the trained failure classifier to ONNX and switch scoring to it"""
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        onnx_model = convert_sklearn(
+            self.failure_classifier,
+            initial_types=[("X", FloatTensorType([None, n_features]))],
+            options={id(self.failure_classifier): {"zipmap": False}}
+        )
+        onnx_path = self.model_dir / "failure_classifier.onnx"
+        onnx_path.write_bytes(onnx_model.SerializeToString())
+        self._load_onnx(onnx_path)
+    
+    def _cache_linear_params(self):
+        """
+        Fold the scaler into a fitted binary linear classifier's weights
+        
+        predict_proba is then sigmoid(X @ w + b) on raw features, with no
+        scaler, sklearn or ONNX call per batch.
+        """
+        coef = getattr(self.failure_classifier, "coef_", None)
+        if coef is None or coef.shape[0] != 1 or self._sc_mean is None:
+            self._lr_w = None
+            return
+        w = coef[0] / self._sc_scale
+        self._lr_w = w
+        self._lr_b = float(self.failure_classifier.intercept_[0] - np.dot(self._sc_mean, w))
+    
+    def _cache_scaler_params(self):
+        """Cache the fitted scaler's mean/scale as float32 arrays"""
+        self._sc_mean = self.scaler.mean_.astype(np.float32)
+        self._sc_scale = self.scaler.scale_.astype(np.float32)
+    
+    def build_shared_context(self, vault: Dict) -> Dict[str, Any]:
+        """Vault-derived inputs that are the same for every repo in a prediction cycle"""
+        return {
+            "repo_roles": vault.get("repo_roles", {}),
+            "decision_frequency": self.count_recent_decisions(vault),
+        }
     
     def extract_features(self, repo: str, internal_memory: Dict, vault: Dict) -> Dict[str, float]:
         """
         Extract ML features from system state
         
+        For many repos, build_shared_context(vault) once and use
+        extract_feature_matrix instead.
+        
         Returns feature dict for prediction
         """
-        now = datetime.utcnow()
+        row = self._scratch[0]
+        self._write_features(row, repo, internal_memory, self.build_shared_context(vault), time.gmtime())
+        return dict(zip(FEATURE_ORDER, row.tolist()))
+    
+    def extract_feature_matrix(self, repos: List[str], internals: Dict[str, Dict], shared: Dict) -> np.ndarray:
+        """
+        Extract features for every repo straight into one (n_repos, n_features) matrix
         
+        `shared` is build_shared_context(vault), computed once per cycle.
+        """
+        X = np.empty((len(repos), len(FEATURE_ORDER)), dtype=np.float64)
+        now = time.gmtime()
+        for i, repo in enumerate(repos):
+            self._write_features(X[i], repo, internals[repo], shared, now)
+        return X
+    
+    def _write_features(self, row: np.ndarray, repo: str, internal_memory: Dict, shared: Dict,
+                        now: time.struct_time):
+        """Fill one feature row in FEATURE_ORDER layout (`now` is a UTC time.gmtime())"""
         # RSI features
         rsi_history = internal_memory.get("rsi_history", [])
         rsi_trend = self._calculate_trend(rsi_history)
         rsi_current = rsi_history[-1] if rsi_history else 98.0
-        rsi_volatility = np.std(rsi_history[-20:]) if len(rsi_history) >= 20 else 0.0
+        # Prefer the rolling stats InternalMemory maintains on write
+        rsi_stats = window_stats(internal_memory, "rsi")
+        if rsi_stats is not None:
+            rsi_volatility = rsi_stats[2] if rsi_stats[0] >= RSI_WINDOW else 0.0
+        else:
+            rsi_volatility = np.std(rsi_history[-RSI_WINDOW:]) if len(rsi_history) >= RSI_WINDOW else 0.0
         
         # Repair features
         repair_times = internal_memory.get("repair_times", [])
-        avg_mttr = np.mean(repair_times[-30:]) if repair_times else 4.0
+        repair_stats = window_stats(internal_memory, "repair")
+        if repair_stats is not None:
+            avg_mttr = repair_stats[1]
+        else:
+            avg_mttr = np.mean(repair_times[-REPAIR_WINDOW:]) if repair_times else 4.0
         mttr_trend = self._calculate_trend(repair_times[-10:])
         repair_frequency = len(repair_times) / max(len(rsi_history), 1)
         
@@ -93,55 +287,72 @@ class PredictiveEngine:
         chaos_success = internal_memory.get("chaos_success_rate", 1.0)
         total_chaos = internal_memory.get("total_chaos_tests", 0)
         
-        # Repo features from vault
-        kingdom_map = vault.get("kingdom_map", {})
-        repo_data = kingdom_map.get(repo, {})
+        # Repo features from the vault's role assignment
+        role = shared.get("repo_roles", {}).get(repo, {})
         
-        repo_classification = repo_data.get("classification", "muscle")
-        classification_score = {"unicorn": 3, "muscle": 2, "archive": 1}.get(repo_classification, 1)
+        # assign_repo_role stores the score with the role; older roles only have the class
+        classification_score = role.get("classification_score")
+        if classification_score is None:
+            classification_score = CLASSIFICATION_SCORE.get(role.get("assigned_class", "muscle"), 1)
         
         # Activity features
-        recent_decisions = vault.get("recent_decisions", [])
-        decision_frequency = len([d for d in recent_decisions 
-                                  if datetime.fromisoformat(d.get("timestamp", "2000-01-01")) > now - timedelta(hours=24)])
-        
-        features = {
-            # RSI metrics
-            "rsi_current": rsi_current,
-            "rsi_trend": rsi_trend,
-            "rsi_volatility": rsi_volatility,
-            
-            # Repair metrics
-            "avg_mttr": avg_mttr,
-            "mttr_trend": mttr_trend,
-            "repair_frequency": repair_frequency,
-            
-            # Chaos metrics
-            "chaos_success_rate": chaos_success,
-            "total_chaos_tests": total_chaos,
-            
-            # Repo characteristics
-            "repo_classification": classification_score,
-            "decision_frequency": decision_frequency,
-            
-            # Time features
-            "hour_of_day": now.hour,
-            "day_of_week": now.weekday(),
-        }
+        decision_frequency = shared.get("decision_frequency", 0)
+        
+        # RSI metrics
+        row[RSI_CURRENT] = rsi_current
+        row[RSI_TREND] = rsi_trend
+        row[RSI_VOLATILITY] = rsi_volatility
+        
+        # Repair metrics
+        row[AVG_MTTR] = avg_mttr
+        row[MTTR_TREND] = mttr_trend
+        row[REPAIR_FREQUENCY] = repair_frequency
+        
+        # Chaos metrics
+        row[CHAOS_SUCCESS_RATE] = chaos_success
+        row[TOTAL_CHAOS_TESTS] = total_chaos
+        
+        # Repo characteristics
+        row[REPO_CLASSIFICATION] = classification_score
+        row[DECISION_FREQUENCY] = decision_frequency
         
-        return features
+        # Time features
+        row[HOUR_OF_DAY] = now.tm_hour
+        row[DAY_OF_WEEK] = now.tm_wday
+    
+    @staticmethod
+    def count_recent_decisions(vault: Dict, hours: int = 24) -> int:
+        """
+        Count vault decisions made in the last `hours`
+        
+        TheVault stores decisions newest first, so the cutoff is found by
+        binary search on their epoch timestamps.
+        """
+        decisions = vault.get("decisions", [])
+        if not decisions:
+            return 0
+        
+        epochs = np.asarray([
+            d["ts_epoch"] if d.get("ts_epoch") is not None
+            else _iso_to_epoch(d.get("timestamp", "2000-01-01"))
+            for d in decisions
+        ], dtype=np.float64)
+        cutoff = time.time() - hours * 3600
+        # Negate to get ascending order; counts entries newer than cutoff
+        return int(np.searchsorted(-epochs, -cutoff, side="left"))
     
     def _calculate_trend(self, values: List[float]) -> float:
         """Calculate trend slope from time series"""
-        if len(values) < 2:
+        n = len(values)
+        if n < 2:
             return 0.0
         
-        x = np.arange(len(values))
-        y = np.array(values)
-        
-        # Simple linear regression slope
-        slope = np.polyfit(x, y, 1)[0] if len(values) > 1 else 0.0
-        return slope
+        # Closed-form least-squares slope over x = 0..n-1; the x sums are known,
+        # so short histories need no array allocations
+        sum_y = math.fsum(values)
+        sum_xy = math.fsum(i * v for i, v in enumerate(values))
+        den = n * (n * n - 1) / 12.0  # sum((x - x_mean)^2) for x = 0..n-1
+        return (sum_xy - (n - 1) / 2.0 * sum_y) / den
     
     def predict_failure_probability(self, repo: str, internal_memory: Dict, vault: Dict, hours_ahead: int = 24) -> Dict[str, Any]:
         """
@@ -156,20 +367,66 @@ class PredictiveEngine:
                 "recommended_action": "proactive_maintenance"
             }
         """
-        features = self.extract_features(repo, internal_memory, vault)
-        feature_vector = np.array([[v for v in features.values()]])
+        self._write_features(self._scratch[0], repo, internal_memory, self.build_shared_context(vault), time.gmtime())
+        return self.predict_failure_probability_matrix([repo], self._scratch, hours_ahead)[0]
+    
+    def predict_failure_probability_batch(self, repos: List[str], features_list: List[Dict[str, float]],
+                                          hours_ahead: int = 24) -> List[Dict[str, Any]]:
+        """
+        Predict failure probability for many repos at once
+        
+        Scores the whole (n_repos x n_features) matrix in a single
+        scaler/classifier call instead of one call per repo.
+        """
+        return self.predict_failure_probability_matrix(repos, self._features_matrix(features_list), hours_ahead)
+    
+    def predict_failure_probability_matrix(self, repos: List[str], X: np.ndarray,
+                                           hours_ahead: int = 24) -> List[Dict[str, Any]]:
+        """Predict failure probability for the rows of a FEATURE_ORDER feature matrix"""
+        if not repos:
+            return []
         
         # Check if model is trained
         if not hasattr(self.failure_classifier, 'classes_'):
             # Model not trained yet, use heuristic
-            probability = self._heuristic_failure_prediction(features)
-            confidence = 0.5
+            probabilities = self._heuristic_failure_prediction(X)
+            confidences = np.full(len(repos), 0.5)
+        elif self._lr_w is not None:
+            # Linear model: one matrix-vector product for the whole batch
+            probabilities = 1.0 / (1.0 + np.exp(-(X @ self._lr_w + self._lr_b)))
+            confidences = self._estimate_confidence(X)
         else:
             # Use trained model
-            feature_vector_scaled = self.scaler.transform(feature_vector)
-            probability = self.failure_classifier.predict_proba(feature_vector_scaled)[0][1]
-            confidence = self._estimate_confidence(features)
-        
+            X_scaled = (X.astype(np.float32) - self._sc_mean) / self._sc_scale
+            if self._onnx_sess is not None:
+                # Outputs are (label, probabilities)
+                probabilities = self._onnx_sess.run(None, {"X": X_scaled.astype(np.float32)})[1][:, 1]
+            else:
+                probabilities = self.failure_classifier.predict_proba(X_scaled)[:, 1]
+            confidences = self._estimate_confidence(X)
+        
+        factor_masks = self._risk_factor_mask(X)
+        timestamp = _epoch_to_iso(time.time())
+        
+        return [
+            self._build_prediction(repo, dict(zip(FEATURE_ORDER, row)), probability, confidence, mask,
+                                   hours_ahead, timestamp)
+            for repo, row, probability, confidence, mask
+            in zip(repos, X.tolist(), probabilities, confidences, factor_masks)
+        ]
+    
+    @staticmethod
+    def _features_matrix(features_list: List[Dict[str, float]]) -> np.ndarray:
+        """Stack feature dicts into an (n, len(FEATURE_ORDER)) matrix in fixed column order"""
+        return np.asarray(
+            [[features[name] for name in FEATURE_ORDER] for features in features_list],
+            dtype=np.float64
+        )
+    
+    def _build_prediction(self, repo: str, features: Dict[str, float], probability: float,
+                          confidence: float, factor_mask: int, hours_ahead: int,
+                          timestamp: str) -> Dict[str, Any]:
+        """Assemble the prediction record for one repo"""
         # Determine risk level
         if probability >= 0.8:
             risk_level = "critical"
@@ -181,7 +438,7 @@ class PredictiveEngine:
             risk_level = "low"
         
         # Identify contributing factors
-        factors = self._identify_risk_factors(features)
+        factors = self._identify_risk_factors(factor_mask)
         
         # Recommend action
         recommended_action = self._recommend_action(risk_level, factors)
@@ -194,7 +451,7 @@ class PredictiveEngine:
             "prediction_horizon_hours": hours_ahead,
             "factors": factors,
             "recommended_action": recommended_action,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
             "features": features
         }
         
@@ -202,77 +459,47 @@ class PredictiveEngine:
         
         return prediction
     
-    def _heuristic_failure_prediction(self, features: Dict[str, float]) -> float:
-        """Heuristic prediction when ML model is not trained"""
-        score = 0.0
+    @staticmethod
+    def _heuristic_failure_prediction(X: np.ndarray) -> np.ndarray:
+        """Heuristic prediction when ML model is not trained (one score per row of X)"""
+        rsi = X[:, RSI_CURRENT]
         
         # RSI based
-        rsi = features.get("rsi_current", 98.0)
-        if rsi < 70:
-            score += 0.4
-        elif rsi < 85:
-            score += 0.2
-        
-        # MTTR trend
-        if features.get("mttr_trend", 0) > 0:
-            score += 0.2
+        score = 0.4 * (rsi < 70) + 0.2 * ((rsi >= 70) & (rsi < 85))
         
-        # Chaos success
-        if features.get("chaos_success_rate", 1.0) < 0.7:
-            score += 0.2
+        # MTTR trend, chaos success, repair frequency
+        score += 0.2 * (X[:, MTTR_TREND] > 0)
+        score += 0.2 * (X[:, CHAOS_SUCCESS_RATE] < 0.7)
+        score += 0.2 * (X[:, REPAIR_FREQUENCY] > 0.1)
         
-        # Repair frequency
-        if features.get("repair_frequency", 0) > 0.1:
-            score += 0.2
-        
-        return min(score, 1.0)
+        return np.minimum(score, 1.0)
     
-    def _estimate_confidence(self, features: Dict[str, float]) -> float:
-        """Estimate prediction confidence based on data quality"""
-        confidence = 0.5
-        
+    @staticmethod
+    def _estimate_confidence(X: np.ndarray) -> np.ndarray:
+        """Estimate prediction confidence based on data quality (one value per row of X)"""
         # More data = higher confidence
-        if features.get("total_chaos_tests", 0) > 50:
-            confidence += 0.2
-        if features.get("repair_frequency", 0) > 0:
-            confidence += 0.15
+        confidence = 0.5 + 0.2 * (X[:, TOTAL_CHAOS_TESTS] > 50)
+        confidence += 0.15 * (X[:, REPAIR_FREQUENCY] > 0)
         
         # Stable RSI = higher confidence
-        if features.get("rsi_volatility", 1.0) < 5:
-            confidence += 0.15
+        confidence += 0.15 * (X[:, RSI_VOLATILITY] < 5)
         
-        return min(confidence, 0.95)
+        return np.minimum(confidence, 0.95)
     
-    def _identify_risk_factors(self, features: Dict[str, float]) -> List[str]:
+    @staticmethod
+    def _risk_factor_mask(X: np.ndarray) -> np.ndarray:
+        """Bitmask of contributing risk factors per row; bit i maps to RISK_FACTORS[i]"""
+        hits = X[:, _RF_IDX] * _RF_DIR > _RF_THR * _RF_DIR
+        return (hits * _RF_BIT).sum(axis=1, dtype=np.uint16)
+    
+    @staticmethod
+    def _identify_risk_factors(factor_mask: int) -> List[str]:
         """Identify which factors contribute to risk"""
-        factors = []
-        
-        if features.get("rsi_current", 98.0) < 80:
-            factors.append("Low RSI (instability detected)")
-        
-        if features.get("rsi_trend", 0) < -0.5:
-            factors.append("Declining RSI trend")
-        
-        if features.get("mttr_trend", 0) > 0.5:
-            factors.append("Increasing repair times")
-        
-        if features.get("chaos_success_rate", 1.0) < 0.8:
-            factors.append("Poor chaos test performance")
-        
-        if features.get("decision_frequency", 0) > 5:
-            factors.append("High decision frequency (unstable)")
-        
-        return factors
+        return [message for bit, message in enumerate(RISK_FACTORS) if factor_mask >> bit & 1]
     
     def _recommend_action(self, risk_level: str, factors: List[str]) -> str:
         """Recommend action based on risk"""
-        actions = {
-            "critical": "immediate_proactive_maintenance",
-            "high": "schedule_maintenance",
-            "medium": "increase_monitoring",
-            "low": "continue_normal_ops"
-        }
-        return actions.get(risk_level, "monitor")
+        return self._ACTIONS.get(risk_level, "monitor")
     
     def predict_mttr(self, repo: str, issue_type: str, features: Dict) -> Dict[str, Any]:
         """Predict Mean Time To Repair for a specific issue"""
@@ -304,31 +531,33 @@ class PredictiveEngine:
         logger.info(f"🧠 Training models with {len(historical_data)} samples...")
         
         # Prepare training data
-        X = []
+        X = self._features_matrix([record.get("features", {}) for record in historical_data])
         y_failure = []
         y_mttr = []
         
         for record in historical_data:
-            features = record.get("features", {})
-            X.append([v for v in features.values()])
             y_failure.append(1 if record.get("failure_occurred") else 0)
             y_mttr.append(record.get("mttr_minutes", 4.0))
         
-        X = np.array(X)
         y_failure = np.array(y_failure)
         y_mttr = np.array(y_mttr)
         
         # Scale features
         X_scaled = self.scaler.fit_transform(X)
+        self._cache_scaler_params()
         
         # Train models
         self.failure_classifier.fit(X_scaled, y_failure)
         self.mttr_regressor.fit(X_scaled, y_mttr)
+        self._cache_linear_params()
         
         # Save models
-        joblib.dump(self.failure_classifier, self.model_dir / "failure_classifier.pkl")
-        joblib.dump(self.mttr_regressor, self.model_dir / "mttr_regressor.pkl")
-        joblib.dump(self.scaler, self.model_dir / "scaler.pkl")
+        self._dump_artifact(self.failure_classifier, self.model_dir / "failure_classifier.pkl")
+        self._dump_artifact(self.mttr_regressor, self.model_dir / "mttr_regressor.pkl")
+        self._dump_artifact(self.scaler, self.model_dir / "scaler.pkl")
+        np.save(self.model_dir / "scaler_params.npy", np.stack([self._sc_mean, self._sc_scale]))
+        if self._lr_w is None:
+            self._export_onnx(X.shape[1])
         
         logger.info("✅ Models trained and saved")
     
@@ -336,29 +565,28 @@ class PredictiveEngine:
         """Continuously run predictions for all repos"""
         logger.info(f"🔮 Continuous prediction started (interval: {check_interval_minutes}m)")
         
+        # Built once; vault/internal state is re-read from disk each cycle
+        memory = UnifiedMemory()
+        
         while True:
             try:
                 # Load current state
-                from ai_ulu_agents.agents.core.memory_v2 import UnifiedMemory
-                memory = UnifiedMemory()
-                
                 vault = memory.vault.load()
-                kingdom_map = vault.get("kingdom_map", {})
+                shared = self.build_shared_context(vault)
                 
-                predictions = []
-                for repo in kingdom_map.keys():
-                    internal = memory.internal.load(repo)
-                    prediction = self.predict_failure_probability(repo, internal, vault)
-                    predictions.append(prediction)
-                    
+                # Score every repo in one batch, reading internal memory once
+                repos = list(shared["repo_roles"].keys())
+                internals = memory.internal.load_all(repos)
+                X = self.extract_feature_matrix(repos, internals, shared)
+                predictions = self.predict_failure_probability_matrix(repos, X)
+                
+                for prediction in predictions:
                     # Trigger auto-remediation if critical
                     if prediction["risk_level"] == "critical":
-                        await self._trigger_auto_remediation(repo, prediction)
+                        await self._trigger_auto_remediation(prediction["repo"], prediction)
                 
                 # Save predictions
-                predictions_path = self.model_dir / "latest_predictions.json"
-                with open(predictions_path, "w") as f:
-                    json.dump(predictions, f, indent=2)
+                self._save_predictions(predictions)
                 
                 logger.info(f"📊 Predictions updated for {len(predictions)} repos")
                 
@@ -367,6 +595,27 @@ class PredictiveEngine:
             
             await asyncio.sleep(check_interval_minutes * 60)
     
+    def _save_predictions(self, predictions: List[Dict[str, Any]]) -> bool:
+        """
+        Atomically replace latest_predictions.json
+        
+        Skipped when nothing but the timestamps changed since the last write.
+        Returns True if the file was written.
+        """
+        digest = hashlib.blake2b(orjson.dumps(
+            [{k: v for k, v in p.items() if k != "timestamp"} for p in predictions],
+            option=orjson.OPT_SERIALIZE_NUMPY
+        ), digest_size=16).digest()
+        if digest == self._last_predictions_digest:
+            return False
+        
+        predictions_path = self.model_dir / "latest_predictions.json"
+        tmp_path = predictions_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(orjson.dumps(predictions, option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(tmp_path, predictions_path)
+        self._last_predictions_digest = digest
+        return True
+    
     async def _trigger_auto_remediation(self, repo: str, prediction: Dict):
         """Trigger proactive maintenance for critical predictions"""
         logger.warning(f"🚨 CRITICAL: Triggering auto-remediation for {repo}")
@@ -376,7 +625,7 @@ class PredictiveEngine:
             "type": "proactive_maintenance",
             "repo": repo,
             "reason": prediction,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _epoch_to_iso(time.time()),
             "actions": [
                 "increase_monitoring_frequency",
                 "prepare_rollback",
@@ -384,17 +633,10 @@ class PredictiveEngine:
             ]
         }
         
-        # Save remediation plan
-        remediations_path = self.model_dir / "pending_remediations.json"
-        remediations = []
-        if remediations_path.exists():
-            with open(remediations_path) as f:
-                remediations = json.load(f)
-        
-        remediations.append(remediation)
-        
-        with open(remediations_path, "w") as f:
-            json.dump(remediations, f, indent=2)
+        # Append remediation plan (JSONL, one record per line)
+        remediations_path = self.model_dir / "pending_remediations.jsonl"
+        with open(remediations_path, "ab") as f:
+            f.write(orjson.dumps(remediation, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
         
         # TODO: Notify via WebSocket
         logger.info(f"✅ Remediation plan created for {repo}")
@@ -456,11 +698,10 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1 and sys.argv[1] == "predict":
         # Single prediction
-        from ai_ulu_agents.agents.core.memory_v2 import UnifiedMemory
         memory = UnifiedMemory()
         vault = memory.vault.load()
         
-        for repo in vault.get("kingdom_map", {}).keys():
+        for repo in vault.get("repo_roles", {}).keys():
             internal = memory.internal.load(repo)
             pred = engine.predict_failure_probability(repo, internal, vault)
             print(f"\n{repo}:")
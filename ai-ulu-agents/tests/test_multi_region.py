@@ -0,0 +1,167 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from multi_region._types import CRDTState, GlobalTask, RegionStatus
+from multi_region.orchestrator import MultiRegionOrchestrator
+
+
+def make_orchestrator(tmp_path: Path) -> MultiRegionOrchestrator:
+    return MultiRegionOrchestrator(config_path=str(tmp_path / "config.json"))
+
+
+def test_heartbeat_delay_backs_off_on_failure(tmp_path: Path) -> None:
+    orch = make_orchestrator(tmp_path)
+    region = orch.regions["us-west"]
+
+    healthy_delay = orch._next_heartbeat_delay(region)
+    assert abs(healthy_delay - orch.heartbeat_interval) <= orch.heartbeat_jitter
+
+    delays = []
+    for failures in (1, 2, 3, 10):
+        orch.region_failures[region.id] = failures
+        delays.append(orch._next_heartbeat_delay(region))
+    assert delays == [1.0, 2.0, 4.0, float(orch.heartbeat_interval)]
+
+
+def test_crdt_absorb_matches_merge() -> None:
+    t0 = datetime(2024, 1, 1)
+    t1 = t0 + timedelta(seconds=1)
+
+    local = CRDTState()
+    local.update("a", "local", "us-west", t1)
+    local.update("b", "local", "us-west", t0)
+
+    remote = CRDTState()
+    remote.update("a", "remote", "eu-central", t0)
+    remote.update("b", "remote", "eu-central", t1)
+    remote.update("c", "remote", "eu-central", t0)
+
+    merged = local.merge(remote)
+    absorbed = local.absorb(remote)
+
+    assert absorbed is local
+    assert absorbed.state == merged.state == {"a": "local", "b": "remote", "c": "remote"}
+    assert absorbed.timestamps == merged.timestamps
+    assert absorbed.vector_clock == merged.vector_clock
+
+
+def test_best_region_uses_score_index(tmp_path: Path) -> None:
+    orch = make_orchestrator(tmp_path)
+    for region_id, latency, load in (
+        ("us-west", 200.0, 0.1),
+        ("eu-central", 50.0, 0.2),
+        ("asia-pacific", 10.0, 0.9),
+    ):
+        region = orch.regions[region_id]
+        region.status = RegionStatus.HEALTHY
+        region.latency_ms = latency
+        region.load_factor = load
+    orch._rebuild_region_index()
+
+    assert orch.get_best_region(GlobalTask(id="t", type="x", payload={})).id == "eu-central"
+    task = GlobalTask(id="t", type="x", payload={}, preferred_regions=["us-west", "asia-pacific"])
+    assert orch.get_best_region(task).id == "us-west"
+
+    orch.regions["eu-central"].status = RegionStatus.OFFLINE
+    orch._rebuild_region_index()
+    assert orch.get_best_region(GlobalTask(id="t", type="x", payload={})).id == "us-west"
+
+
+def test_sync_skips_regions_already_up_to_date(tmp_path: Path) -> None:
+    orch = make_orchestrator(tmp_path)
+    for region in orch.regions.values():
+        region.status = RegionStatus.HEALTHY
+
+    t0 = datetime(2024, 1, 1)
+    remote = {region_id: CRDTState() for region_id in orch.regions}
+    remote["us-west"].update("a", 1, "us-west", t0)
+    pushed = []
+
+    async def fetch(region):
+        return remote[region.id]
+
+    async def push(region, state):
+        pushed.append(region.id)
+
+    orch._fetch_region_state = fetch
+    orch._push_state_to_region = push
+
+    asyncio.run(orch._sync_state())
+    assert sorted(pushed) == ["asia-pacific", "eu-central"]
+
+    # Regions now report the merged clock, so the next cycle is a no-op
+    for state in remote.values():
+        state.absorb(orch.global_state)
+    pushed.clear()
+    asyncio.run(orch._sync_state())
+    assert pushed == []
+
+
+def test_merkle_root_tracks_content_not_order() -> None:
+    t0 = datetime(2024, 1, 1)
+    a = CRDTState()
+    a.update("x", {"v": 1}, "us-west", t0)
+    a.update("y", [1, 2], "us-west", t0)
+
+    b = CRDTState()
+    b.update("y", [1, 2], "eu-central", t0)
+    b.update("x", {"v": 1}, "eu-central", t0)
+
+    assert a.root_hash() == b.root_hash()
+    assert a.mismatched_buckets(b.bucket_hashes()) == []
+
+    b.update("x", {"v": 2}, "eu-central", t0 + timedelta(seconds=1))
+    assert a.root_hash() != b.root_hash()
+    mismatched = a.mismatched_buckets(b.bucket_hashes())
+    assert mismatched == [CRDTState._bucket_of("x")]
+
+    a.absorb(CRDTState.from_dict(b.bucket_to_dict(mismatched[0])))
+    assert a.root_hash() == b.root_hash()
+
+
+def test_mismatched_buckets_pulls_everything_on_layout_mismatch() -> None:
+    state = CRDTState()
+    state.update("x", 1, "us-west", datetime(2024, 1, 1))
+    every_bucket = list(range(len(state.bucket_hashes())))
+
+    assert state.mismatched_buckets([]) == every_bucket
+    assert state.mismatched_buckets(state.bucket_hashes()[:-1]) == every_bucket
+
+
+def test_best_region_cache_invalidated_by_health_change(tmp_path: Path) -> None:
+    orch = make_orchestrator(tmp_path)
+    orch.regions["us-west"].status = RegionStatus.HEALTHY
+    orch._rebuild_region_index()
+    task = GlobalTask(id="t", type="x", payload={})
+
+    assert orch.get_best_region(task).id == "us-west"
+    assert orch._best_region_cache == {(): "us-west"}
+
+    orch.regions["us-west"].status = RegionStatus.OFFLINE
+    orch.regions["eu-central"].status = RegionStatus.HEALTHY
+    orch._rebuild_region_index()
+    assert orch.get_best_region(task).id == "eu-central"
+
+
+def test_merkle_hash_accepts_values_orjson_rejects() -> None:
+    t0 = datetime(2024, 1, 1)
+    values = {"int_keys": {1: "a"}, "big": 2**70, "mixed": {1: "a", "x": 2**70}}
+
+    a = CRDTState()
+    for key, value in values.items():
+        assert a.update(key, value, "us-west", t0)
+
+    b = CRDTState()
+    for key, value in reversed(list(values.items())):
+        b.update(key, value, "eu-central", t0)
+    assert a.root_hash() == b.root_hash()
+
+    # Hashes are refreshed lazily after later writes
+    a.update("big", 2**71, "us-west", t0 + timedelta(seconds=1))
+    assert a.mismatched_buckets(b.bucket_hashes()) == [CRDTState._bucket_of("big")]
+    b.absorb(a)
+    assert a.root_hash() == b.root_hash()
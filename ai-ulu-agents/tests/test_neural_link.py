@@ -0,0 +1,100 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from websocket.server import OUTBOUND_QUEUE_SIZE, ConnectionClosed, NeuralLink, NeuralLinkAgent
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, message) -> None:
+        self.sent.append(json.loads(message))
+
+
+def test_relay_coalesces_queued_events() -> None:
+    async def scenario() -> list:
+        link = NeuralLink()
+        ws = FakeSocket()
+        queue = asyncio.Queue(OUTBOUND_QUEUE_SIZE)
+        link.queues[ws] = queue
+        link.dashboard_connections.add(ws)
+
+        for i in range(3):
+            await link.broadcast_to_dashboards({"event": "metrics.update", "seq": i})
+        relay = asyncio.create_task(link._relay(ws, queue))
+        await asyncio.sleep(0)
+        await link.broadcast_to_dashboards({"event": "agent.activity", "seq": 3})
+        await asyncio.sleep(0)
+        relay.cancel()
+        return ws.sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0] == {"event": "batch", "items": [{"event": "metrics.update", "seq": i} for i in range(3)]}
+    assert sent[1] == {"event": "agent.activity", "seq": 3}
+
+
+def test_full_queue_drops_oldest() -> None:
+    async def scenario() -> asyncio.Queue:
+        link = NeuralLink()
+        ws = FakeSocket()
+        link.queues[ws] = asyncio.Queue(OUTBOUND_QUEUE_SIZE)
+        link.dashboard_connections.add(ws)
+        for i in range(OUTBOUND_QUEUE_SIZE + 5):
+            await link.broadcast_to_dashboards({"event": "metrics.update", "seq": i})
+        return link.queues[ws]
+
+    queue = asyncio.run(scenario())
+    assert queue.qsize() == OUTBOUND_QUEUE_SIZE
+    assert json.loads(queue.get_nowait())["seq"] == 5
+
+
+def test_forwarded_events_reuse_incoming_bytes() -> None:
+    async def scenario() -> bytes:
+        link = NeuralLink()
+        ws = FakeSocket()
+        link.queues[ws] = asyncio.Queue(OUTBOUND_QUEUE_SIZE)
+        link.dashboard_connections.add(ws)
+        raw = b'{"event": "metrics.update", "rsi": 97.5}'
+        await link.process_message(json.loads(raw), "agent", raw)
+        return link.queues[ws].get_nowait()
+
+    assert asyncio.run(scenario()) == b'{"event": "metrics.update", "rsi": 97.5}'
+
+
+def test_relay_stops_quietly_when_connection_closes() -> None:
+    class ClosedSocket:
+        async def send(self, message) -> None:
+            raise ConnectionClosed(None, None)
+
+    async def scenario() -> None:
+        link = NeuralLink()
+        queue = asyncio.Queue(OUTBOUND_QUEUE_SIZE)
+        queue.put_nowait(b'{"event":"metrics.update"}')
+        return await asyncio.wait_for(link._relay(ClosedSocket(), queue), timeout=1)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_agent_answers_heartbeat_pings() -> None:
+    class ServerSocket(FakeSocket):
+        def __init__(self, frames) -> None:
+            super().__init__()
+            self.frames = frames
+
+        async def __aiter__(self):
+            for frame in self.frames:
+                yield frame
+
+    frames = [
+        b'{"event":"ping"}',
+        b'{"event":"state.full","connected_agents":[]}',
+        b'{"event":"batch","items":[{"event":"metrics.update"},{"event":"ping"}]}',
+    ]
+    ws = ServerSocket(frames)
+    asyncio.run(NeuralLinkAgent("repair-agent")._read_loop(ws))
+    assert ws.sent == [{"event": "pong"}, {"event": "pong"}]
@@ -0,0 +1,297 @@
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import orjson
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.core.memory_v2 import (
+    REPAIR_WINDOW,
+    RSI_WINDOW,
+    DecisionType,
+    InternalMemory,
+    RepoClass,
+    TheVault,
+    window_stats,
+)
+from prediction.predictive_engine import PredictiveEngine
+
+
+def make_internal(rsi_start: float, rsi_step: float) -> dict:
+    return {
+        "rsi_history": [rsi_start + rsi_step * i for i in range(25)],
+        "repair_times": [3.0 + 0.1 * i for i in range(12)],
+        "chaos_success_rate": 0.9,
+        "total_chaos_tests": 60,
+    }
+
+
+def training_data(engine: PredictiveEngine) -> list:
+    records = []
+    for i in range(20):
+        features = engine.extract_features("ai-ulu/QA", make_internal(60 + i * 2, -0.5 + i * 0.05), {})
+        records.append({"features": features, "failure_occurred": i < 10, "mttr_minutes": 4.0 + i})
+    return records
+
+
+def test_batch_prediction_matches_single(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    engine.train(training_data(engine))
+
+    repos = ["ai-ulu/QA", "ai-ulu/GodFather"]
+    internals = [make_internal(70, -1.0), make_internal(97, 0.1)]
+    features_list = [engine.extract_features(r, i, {}) for r, i in zip(repos, internals)]
+
+    batch = engine.predict_failure_probability_batch(repos, features_list)
+    single = [engine.predict_failure_probability(r, i, {}) for r, i in zip(repos, internals)]
+
+    assert [p["repo"] for p in batch] == repos
+    for b, s in zip(batch, single):
+        assert b["probability"] == pytest.approx(s["probability"])
+        assert b["risk_level"] == s["risk_level"]
+
+
+def test_calculate_trend_matches_polyfit(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    values = [98.0, 97.5, 96.0, 96.5, 94.0, 93.2, 95.1, 90.0, 89.9, 88.0]
+
+    assert engine._calculate_trend(values) == pytest.approx(np.polyfit(np.arange(len(values)), values, 1)[0])
+    assert engine._calculate_trend([5.0]) == 0.0
+    assert engine._calculate_trend([]) == 0.0
+
+
+def test_rolling_window_stats_match_numpy(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path / "models"))
+    memory = InternalMemory(storage_path=str(tmp_path / "internal_memory.json"))
+    rsi_values = [98.0 - 0.7 * i + (i % 3) for i in range(35)]
+    repair_values = [3.0 + 0.25 * (i % 7) for i in range(45)]
+
+    for value in rsi_values:
+        memory.record_rsi(value, repo="ai-ulu/QA")
+    for value in repair_values:
+        memory.record_repair(value, repo="ai-ulu/QA")
+
+    internal = memory.load("ai-ulu/QA")
+    n, mean, std = window_stats(internal, "rsi")
+    assert n == RSI_WINDOW
+    assert mean == pytest.approx(np.mean(rsi_values[-RSI_WINDOW:]))
+    assert std == pytest.approx(np.std(rsi_values[-RSI_WINDOW:]))
+    assert memory.get_rsi_volatility("ai-ulu/QA") == pytest.approx(std)
+    assert memory.get_avg_repair_time("ai-ulu/QA") == pytest.approx(np.mean(repair_values[-REPAIR_WINDOW:]))
+    assert memory.get_rsi_volatility("ai-ulu/New") == 0.0
+
+    # Running sums agree with recomputing from the raw history
+    history_only = {"rsi_history": internal["rsi_history"], "repair_times": internal["repair_times"]}
+    expected = engine.extract_features("ai-ulu/QA", history_only, {})
+    features = engine.extract_features("ai-ulu/QA", internal, {})
+    assert features["rsi_volatility"] == pytest.approx(expected["rsi_volatility"])
+    assert features["avg_mttr"] == pytest.approx(expected["avg_mttr"])
+
+
+def test_features_from_recorded_internal_memory(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path / "models"))
+    memory = InternalMemory(storage_path=str(tmp_path / "internal_memory.json"))
+    rsi_values = [98.0 - 0.5 * i for i in range(25)]
+    repair_values = [3.0 + 0.2 * i for i in range(12)]
+
+    for value in rsi_values:
+        memory.record_rsi(value, repo="ai-ulu/QA")
+    for value in repair_values:
+        memory.record_repair(value, repo="ai-ulu/QA")
+    memory.record_rsi(50.0)  # system-wide reading, not tied to a repo
+
+    internals = memory.load_all(["ai-ulu/QA", "ai-ulu/New"])
+    assert internals["ai-ulu/New"] == {}
+    assert internals["ai-ulu/QA"]["rsi_history"] == rsi_values
+
+    features = engine.extract_features("ai-ulu/QA", internals["ai-ulu/QA"], {})
+    assert features["rsi_current"] == rsi_values[-1]
+    assert features["rsi_trend"] == pytest.approx(-0.5)
+    assert features["avg_mttr"] == pytest.approx(np.mean(repair_values))
+    assert features["repair_frequency"] == pytest.approx(len(repair_values) / len(rsi_values))
+
+
+def test_onnx_scoring_matches_sklearn(tmp_path: Path) -> None:
+    from sklearn.ensemble import RandomForestClassifier
+
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    # Non-linear classifiers are exported to and scored through ONNX Runtime
+    engine.failure_classifier = RandomForestClassifier(n_estimators=10, random_state=42)
+    engine.train(training_data(engine))
+    assert (tmp_path / "failure_classifier.onnx").exists()
+
+    features = engine.extract_features("ai-ulu/QA", make_internal(75, -0.8), {})
+    X = np.asarray([list(features.values())], dtype=np.float32)
+    expected = engine.failure_classifier.predict_proba((X - engine._sc_mean) / engine._sc_scale)[0, 1]
+
+    reloaded = PredictiveEngine(model_dir=str(tmp_path))
+    assert reloaded._onnx_sess is not None
+    prediction = reloaded.predict_failure_probability("ai-ulu/QA", make_internal(75, -0.8), {})
+    assert prediction["probability"] == pytest.approx(expected, abs=1e-5)
+
+
+def test_linear_classifier_skips_onnx(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    engine.train(training_data(engine))
+    assert not (tmp_path / "failure_classifier.onnx").exists()
+
+    reloaded = PredictiveEngine(model_dir=str(tmp_path))
+    assert reloaded._lr_w is not None
+    assert reloaded._onnx_sess is None
+
+
+def test_count_recent_decisions_uses_epochs() -> None:
+    now = time.time()
+    decisions = [
+        {"ts_epoch": int(now - 60)},
+        {"ts_epoch": int(now - 3600)},
+        {"timestamp": datetime.fromtimestamp(now - 7200, timezone.utc).replace(tzinfo=None).isoformat() + "Z"},
+        {"ts_epoch": int(now - 2 * 86400)},
+        {"timestamp": "2000-01-01"},
+    ]
+    assert PredictiveEngine.count_recent_decisions({"decisions": decisions}) == 3
+    assert PredictiveEngine.count_recent_decisions({}) == 0
+
+
+def test_count_recent_decisions_from_vault(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(TheVault, "VAULT_PATH", str(tmp_path / "the_vault.json"))
+    vault = TheVault()
+    vault.record_decision(DecisionType.AGENT_POLICY, "system", "enable", "why", "outcome")
+    vault.record_decision(DecisionType.CHAOS_SCENARIO, "ai-ulu/QA", "pause", "why", "outcome")
+
+    document = vault.load()
+    assert all(d["ts_epoch"] is not None for d in document["decisions"])
+    assert PredictiveEngine.count_recent_decisions(document) == 2
+
+    # Older than the window: only the two new decisions count
+    stale = dict(document["decisions"][-1], ts_epoch=int(time.time()) - 3 * 86400)
+    document["decisions"].append(stale)
+    assert PredictiveEngine.count_recent_decisions(document) == 2
+
+
+def test_heuristic_scoring_and_risk_factors(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    repos = ["ai-ulu/QA", "ai-ulu/GodFather"]
+    features_list = [engine.extract_features(r, i, {}) for r, i in zip(repos, [make_internal(60, -1.0), make_internal(97, 0.1)])]
+    features_list[0]["chaos_success_rate"] = 0.5
+
+    unstable, stable = engine.predict_failure_probability_batch(repos, features_list)
+
+    # rsi < 70, rising repair times, poor chaos results, frequent repairs
+    assert unstable["probability"] == pytest.approx(1.0)
+    assert unstable["factors"] == [
+        "Low RSI (instability detected)",
+        "Declining RSI trend",
+        "Poor chaos test performance",
+    ]
+    assert unstable["recommended_action"] == "immediate_proactive_maintenance"
+    assert stable["probability"] == pytest.approx(0.4)
+    assert stable["factors"] == []
+
+
+def test_feature_matrix_matches_feature_dicts(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    repos = ["ai-ulu/QA", "ai-ulu/GodFather"]
+    internals = {"ai-ulu/QA": make_internal(70, -1.0), "ai-ulu/GodFather": make_internal(97, 0.1)}
+
+    X = engine.extract_feature_matrix(repos, internals, {})
+
+    assert X.shape == (2, len(PredictiveEngine.FEATURE_ORDER))
+    for row, repo in zip(X, repos):
+        features = engine.extract_features(repo, internals[repo], {})
+        assert list(features) == list(PredictiveEngine.FEATURE_ORDER)
+        assert row.tolist() == pytest.approx(list(features.values()))
+
+
+def test_models_reload_from_pickle_and_legacy_joblib(tmp_path: Path) -> None:
+    import joblib
+
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    engine.train(training_data(engine))
+    assert (tmp_path / "scaler_params.npy").exists()
+
+    reloaded = PredictiveEngine(model_dir=str(tmp_path))
+    np.testing.assert_array_equal(reloaded._sc_mean, engine._sc_mean)
+    np.testing.assert_array_equal(reloaded._sc_scale, engine._sc_scale)
+
+    # Artifacts written by older versions with joblib still load
+    joblib.dump(engine.scaler, tmp_path / "scaler.pkl")
+    (tmp_path / "scaler_params.npy").unlink()
+    legacy = PredictiveEngine(model_dir=str(tmp_path))
+    np.testing.assert_array_equal(legacy._sc_mean, engine._sc_mean)
+
+
+def test_linear_scoring_matches_predict_proba(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    engine.train(training_data(engine))
+    assert engine._lr_w is not None
+
+    repos = ["ai-ulu/QA", "ai-ulu/GodFather"]
+    internals = {"ai-ulu/QA": make_internal(70, -1.0), "ai-ulu/GodFather": make_internal(97, 0.1)}
+    X = engine.extract_feature_matrix(repos, internals, {})
+    expected = engine.failure_classifier.predict_proba((X - engine.scaler.mean_) / engine.scaler.scale_)[:, 1]
+
+    predictions = engine.predict_failure_probability_matrix(repos, X)
+    assert [p["probability"] for p in predictions] == pytest.approx(expected.tolist(), abs=1e-5)
+
+
+def test_classification_score_from_repo_roles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(TheVault, "VAULT_PATH", str(tmp_path / "the_vault.json"))
+    engine = PredictiveEngine(model_dir=str(tmp_path / "models"))
+    vault = TheVault()
+    vault.assign_repo_role("ai-ulu/QA", RepoClass.UNICORN)
+    vault.assign_repo_role("ai-ulu/Old", RepoClass.ARCHIVE)
+
+    document = vault.load()
+    # Roles written before classification_score existed fall back to the class
+    del document["repo_roles"]["ai-ulu/Old"]["classification_score"]
+
+    assert engine.extract_features("ai-ulu/QA", {}, document)["repo_classification"] == 3
+    assert engine.extract_features("ai-ulu/Old", {}, document)["repo_classification"] == 1
+    assert engine.extract_features("ai-ulu/New", {}, document)["repo_classification"] == 2
+
+    repos = ["ai-ulu/QA", "ai-ulu/Old", "ai-ulu/New"]
+    X = engine.extract_feature_matrix(repos, {r: {} for r in repos}, engine.build_shared_context(document))
+    assert X[:, PredictiveEngine.FEATURE_ORDER.index("repo_classification")].tolist() == [3, 1, 2]
+
+
+def test_save_predictions_skips_unchanged_payload(tmp_path: Path) -> None:
+    engine = PredictiveEngine(model_dir=str(tmp_path))
+    repos = ["ai-ulu/QA"]
+    X = engine.extract_feature_matrix(repos, {"ai-ulu/QA": make_internal(70, -1.0)}, {})
+
+    first = engine.predict_failure_probability_matrix(repos, X)
+    assert engine._save_predictions(first)
+    written = (tmp_path / "latest_predictions.json").read_bytes()
+
+    again = [dict(p, timestamp="2099-01-01T00:00:00") for p in first]
+    assert not engine._save_predictions(again)
+    assert (tmp_path / "latest_predictions.json").read_bytes() == written
+
+    X[0, 0] = 99.0
+    assert engine._save_predictions(engine.predict_failure_probability_matrix(repos, X))
+    assert not (tmp_path / "latest_predictions.json.tmp").exists()
+
+
+def test_continuous_prediction_runs_a_cycle(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TheVault, "VAULT_PATH", str(tmp_path / "the_vault.json"))
+    TheVault().assign_repo_role("ai-ulu/QA", RepoClass.MUSCLE)
+    InternalMemory().record_rsi(97.0, repo="ai-ulu/QA")
+
+    async def stop(_seconds):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(asyncio, "sleep", stop)
+    engine = PredictiveEngine(model_dir=str(tmp_path / "models"))
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(engine.run_continuous_prediction())
+
+    predictions = orjson.loads((tmp_path / "models" / "latest_predictions.json").read_bytes())
+    assert [p["repo"] for p in predictions] == ["ai-ulu/QA"]
+    assert predictions[0]["features"]["rsi_current"] == 97.0
@@ -4,15 +4,51 @@ Gerçek zamanlı iletişim merkezi
 """
 
 import asyncio
+import time
 import websockets
-import json
-from datetime import datetime
-from typing import Dict, Set
+from websockets.exceptions import ConnectionClosed
+import orjson
+from datetime import datetime, timezone
+from typing import Dict, MutableSet, Optional, Union
+from uuid import uuid4
+from weakref import WeakSet
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_dumps = orjson.dumps
+_loads = orjson.loads
+
+# Gelen frame üst sınırı; tüm trafik binary (UTF-8 JSON) frame olduğundan
+# websockets metin frame UTF-8 doğrulaması yapmaz, doğrulamayı orjson.loads yapar
+MAX_FRAME_SIZE = 2 ** 20
+
+# Uygulama seviyesinde heartbeat: websockets'in bağlantı başına ping timer'ı yerine
+# tek bir sunucu görevi; bu süre boyunca hiç frame gelmeyen bağlantı kapatılır
+HEARTBEAT_INTERVAL = 60
+HEARTBEAT_TIMEOUT = 3 * HEARTBEAT_INTERVAL
+
+# Aynı milisaniyedeki olaylar aynı zaman damgasını paylaşır
+_ts_ms = -1
+_ts_iso = ''
+
+
+def _now_iso() -> str:
+    """UTC ISO zaman damgası, milisaniye başına bir kez biçimlendirilir"""
+    global _ts_ms, _ts_iso
+    now = time.time()
+    ms = int(now * 1000)
+    if ms != _ts_ms:
+        _ts_ms = ms
+        _ts_iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return _ts_iso
+
+# Bağlantı başına giden mesaj kuyruğu; dolunca en eski mesaj düşürülür
+OUTBOUND_QUEUE_SIZE = 256
+# Kuyrukta birikmiş en fazla bu kadar olay tek 'batch' frame'inde gönderilir
+MAX_BATCH = 64
+
 
 class NeuralLink:
     """
@@ -23,30 +59,40 @@ class NeuralLink:
     def __init__(self, host='localhost', port=8765):
         self.host = host
         self.port = port
-        self.clients: Set[websockets.WebSocketServerProtocol] = set()
+        # Bağlantılar register()'daki finally bloğunda açıkça temizlenir. queues/last_seen/
+        # ws_to_agent soketi güçlü tuttuğu için WeakSet'ler tek başına sızıntıyı önlemez.
+        self.clients: MutableSet[websockets.WebSocketServerProtocol] = WeakSet()
         self.agent_connections: Dict[str, websockets.WebSocketServerProtocol] = {}
-        self.dashboard_connections: Set[websockets.WebSocketServerProtocol] = set()
+        self.ws_to_agent: Dict[websockets.WebSocketServerProtocol, str] = {}
+        self.dashboard_connections: MutableSet[websockets.WebSocketServerProtocol] = WeakSet()
+        self.queues: Dict[websockets.WebSocketServerProtocol, asyncio.Queue] = {}
+        self.last_seen: Dict[websockets.WebSocketServerProtocol, float] = {}
         
     async def register(self, websocket, path):
         """Yeni bağlantı kaydı"""
         self.clients.add(websocket)
+        queue = asyncio.Queue(OUTBOUND_QUEUE_SIZE)
+        self.queues[websocket] = queue
+        self.last_seen[websocket] = time.monotonic()
+        relay = asyncio.create_task(self._relay(websocket, queue))
         
         try:
             # İlk mesaj: client tipi (agent/dashboard)
             message = await websocket.recv()
-            data = json.loads(message)
+            data = _loads(message)
             client_type = data.get('type', 'unknown')
             
             if client_type == 'agent':
                 agent_id = data.get('agent_id', 'unknown')
                 self.agent_connections[agent_id] = websocket
+                self.ws_to_agent[websocket] = agent_id
                 logger.info(f"🤖 Agent connected: {agent_id}")
                 
                 # Dashboard'lara bildir
                 await self.broadcast_to_dashboards({
                     'event': 'agent.connected',
                     'agent_id': agent_id,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': _now_iso()
                 })
                 
             elif client_type == 'dashboard':
@@ -59,91 +105,118 @@ class NeuralLink:
             # Mesaj dinle
             await self.handle_messages(websocket, client_type)
             
-        except websockets.exceptions.ConnectionClosed:
+        except ConnectionClosed:
             logger.info("Client disconnected")
         finally:
             self.clients.discard(websocket)
             self.dashboard_connections.discard(websocket)
+            self.queues.pop(websocket, None)
+            self.last_seen.pop(websocket, None)
+            relay.cancel()
             
             # Agent bağlantısını temizle
-            for agent_id, conn in list(self.agent_connections.items()):
-                if conn == websocket:
-                    del self.agent_connections[agent_id]
-                    logger.info(f"🤖 Agent disconnected: {agent_id}")
-                    break
+            agent_id = self.ws_to_agent.pop(websocket, None)
+            if agent_id is not None and self.agent_connections.get(agent_id) is websocket:
+                del self.agent_connections[agent_id]
+                logger.info(f"🤖 Agent disconnected: {agent_id}")
     
     async def handle_messages(self, websocket, client_type):
         """Gelen mesajları işle"""
         async for message in websocket:
+            self.last_seen[websocket] = time.monotonic()
             try:
-                data = json.loads(message)
-                await self.process_message(data, client_type)
-            except json.JSONDecodeError:
+                data = _loads(message)
+                raw = message.encode() if isinstance(message, str) else message
+                await self.process_message(data, client_type, raw)
+            except orjson.JSONDecodeError:
                 logger.error(f"Invalid JSON: {message}")
     
-    async def process_message(self, data: dict, source_type: str):
-        """Mesajları yönlendir"""
+    async def process_message(self, data: dict, source_type: str, raw: Optional[bytes] = None):
+        """
+        Mesajları yönlendir
+        
+        `raw` gelen frame'in kendisi; olaylar değiştirilmeden iletildiği için
+        yeniden serileştirmek yerine bu bytes gönderilir.
+        """
         event_type = data.get('event')
+        payload = raw if raw is not None else data
         
         if event_type == 'agent.activity':
             # Agent aktivitesi → Dashboard'a gönder
-            await self.broadcast_to_dashboards(data)
+            await self.broadcast_to_dashboards(payload)
             
         elif event_type == 'agent.error':
             # Hata oluştu! Dashboard'a gönder ve LLM analizi başlat
-            await self.broadcast_to_dashboards(data)
+            await self.broadcast_to_dashboards(payload)
             
             # LLM analizi (async)
             asyncio.create_task(self.analyze_error_with_llm(data))
             
         elif event_type == 'metrics.update':
             # Metrik güncellemesi
-            await self.broadcast_to_dashboards(data)
+            await self.broadcast_to_dashboards(payload)
             
         elif event_type == 'panic.triggered':
             # PANIK! Tüm client'lara bildir
-            await self.broadcast_to_all(data)
+            await self.broadcast_to_all(payload)
             
         elif event_type == 'cortex.decision':
             # Yeni stratejik karar
-            await self.broadcast_to_dashboards(data)
+            await self.broadcast_to_dashboards(payload)
     
-    async def broadcast_to_dashboards(self, data: dict):
-        """Tüm dashboard'lara mesaj gönder"""
+    async def broadcast_to_dashboards(self, data: Union[bytes, dict]):
+        """Tüm dashboard'lara mesaj gönder (dict ya da hazır JSON bytes)"""
         if not self.dashboard_connections:
             return
             
-        message = json.dumps(data)
-        disconnected = []
-        
-        for dashboard in self.dashboard_connections:
-            try:
-                await dashboard.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.append(dashboard)
-        
-        # Temizlik
-        for d in disconnected:
-            self.dashboard_connections.discard(d)
+        payload = data if isinstance(data, bytes) else _dumps(data)
+        for dashboard in tuple(self.dashboard_connections):
+            self._enqueue(dashboard, payload)
     
-    async def broadcast_to_all(self, data: dict):
-        """Tüm client'lara mesaj gönder"""
-        message = json.dumps(data)
+    async def broadcast_to_all(self, data: Union[bytes, dict]):
+        """Tüm client'lara mesaj gönder (dict ya da hazır JSON bytes)"""
+        if not self.clients:
+            return
         
-        for client in self.clients:
-            try:
-                await client.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                pass
+        payload = data if isinstance(data, bytes) else _dumps(data)
+        for client in tuple(self.clients):
+            self._enqueue(client, payload)
+    
+    def _enqueue(self, websocket, message: bytes):
+        """Serileştirilmiş olayı bağlantının kuyruğuna koy (beklemeden; doluysa en eskisini at)"""
+        queue = self.queues.get(websocket)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            queue.get_nowait()
+            queue.put_nowait(message)
+    
+    async def _relay(self, websocket, queue: asyncio.Queue):
+        """Kuyruktaki olayları bağlantıya yaz; birikmiş olanları tek frame'de birleştir"""
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty() and len(batch) < MAX_BATCH:
+                    batch.append(queue.get_nowait())
+                
+                # Olaylar zaten JSON bytes; batch frame yeniden serileştirmeden birleştirilir
+                if len(batch) == 1:
+                    await websocket.send(batch[0])
+                else:
+                    await websocket.send(b'{"event":"batch","items":[' + b','.join(batch) + b']}')
+        except ConnectionClosed:
+            pass
     
     async def send_current_state(self, dashboard):
         """Yeni dashboard'a mevcut durumu gönder"""
         state = {
             'event': 'state.full',
             'connected_agents': list(self.agent_connections.keys()),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }
-        await dashboard.send(json.dumps(state))
+        self._enqueue(dashboard, _dumps(state))
     
     async def analyze_error_with_llm(self, error_data: dict):
         """Hatayı LLM ile analiz et"""
@@ -159,7 +232,7 @@ class NeuralLink:
             'suggested_fix': 'Implement file locking mechanism',
             'confidence': 0.95,
             'auto_apply': True,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }
         
         await self.broadcast_to_dashboards(analysis)
@@ -168,8 +241,25 @@ class NeuralLink:
         """Sunucuyu başlat"""
         logger.info(f"🚀 Neural Link starting on ws://{self.host}:{self.port}")
         
-        async with websockets.serve(self.register, self.host, self.port):
-            await asyncio.Future()  # Sonsuz bekle
+        # permessage-deflate kapalı: aynı broadcast her bağlantı için ayrı ayrı sıkıştırılmasın
+        async with websockets.serve(self.register, self.host, self.port,
+                                    max_size=MAX_FRAME_SIZE, compression=None, ping_interval=None):
+            heartbeat = asyncio.create_task(self._heartbeat())
+            try:
+                await asyncio.Future()  # Sonsuz bekle
+            finally:
+                heartbeat.cancel()
+    
+    async def _heartbeat(self):
+        """Tüm client'lara periyodik ping; sessiz kalan bağlantıları kapat"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            
+            cutoff = time.monotonic() - HEARTBEAT_TIMEOUT
+            stale = [websocket for websocket, seen in list(self.last_seen.items()) if seen < cutoff]
+            await asyncio.gather(*(websocket.close() for websocket in stale), return_exceptions=True)
+            
+            await self.broadcast_to_all({'event': 'ping'})
 
 
 # Agent tarafı entegrasyonu
@@ -181,24 +271,46 @@ class NeuralLinkAgent:
         self.server_url = server_url
         self.websocket = None
         self.connected = False
+        self._reader: Optional[asyncio.Task] = None
     
     async def connect(self):
         """Sunucuya bağlan"""
         try:
-            self.websocket = await websockets.connect(self.server_url)
+            self.websocket = await websockets.connect(self.server_url, max_size=MAX_FRAME_SIZE,
+                                                      compression=None, ping_interval=None,
+                                                      ping_timeout=None, max_queue=OUTBOUND_QUEUE_SIZE)
             
             # Kayıt mesajı gönder
-            await self.websocket.send(json.dumps({
+            await self.websocket.send(_dumps({
                 'type': 'agent',
                 'agent_id': self.agent_id
             }))
             
             self.connected = True
+            
+            # Sunucunun uygulama seviyesindeki ping'lerini cevaplamak için gelen frame'leri oku
+            if self._reader is not None:
+                self._reader.cancel()
+            self._reader = asyncio.create_task(self._read_loop(self.websocket))
             logger.info(f"✅ {self.agent_id} connected to Neural Link")
             
         except Exception as e:
             logger.error(f"❌ Connection failed: {e}")
     
+    async def _read_loop(self, websocket):
+        """Gelen frame'leri tüket; 'ping' (tek başına ya da batch içinde) için 'pong' gönder"""
+        try:
+            async for message in websocket:
+                try:
+                    data = _loads(message)
+                except orjson.JSONDecodeError:
+                    continue
+                events = data.get('items', []) if data.get('event') == 'batch' else [data]
+                if any(item.get('event') == 'ping' for item in events):
+                    await websocket.send(_dumps({'event': 'pong'}))
+        except ConnectionClosed:
+            self.connected = False
+    
     async def emit(self, event: str, data: dict):
         """Olay yayınla"""
         if not self.connected:
@@ -208,12 +320,12 @@ class NeuralLinkAgent:
             'event': event,
             'agent_id': self.agent_id,
             'data': data,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }
         
         try:
-            await self.websocket.send(json.dumps(message))
-        except websockets.exceptions.ConnectionClosed:
+            await self.websocket.send(_dumps(message))
+        except ConnectionClosed:
             self.connected = False
             logger.warning(f"⚠️ {self.agent_id} disconnected, retrying...")
             await self.connect()
@@ -231,11 +343,18 @@ class NeuralLinkAgent:
         await self.emit('agent.error', {
             'error': error,
             'context': context or {},
-            'error_id': f"err_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+            'error_id': f"err_{uuid4().hex[:12]}"
         })
 
 
 # Başlat
 if __name__ == '__main__':
     neural_link = NeuralLink()
-    asyncio.run(neural_link.start())
+    
+    # libuv tabanlı event loop (Windows'ta yok, varsayılan loop'a düş)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(neural_link.start())
+    else:
+        uvloop.run(neural_link.start())
@@ -1,14 +1,15 @@
-import json
 import sys
 from pathlib import Path
 
+import orjson
+
 
 def load_policy(path: Path) -> dict:
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
+        return orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError:
         return {}
 
 
@@ -29,7 +30,7 @@ def main() -> int:
     data = load_policy(policy_path)
     thresholds = data.setdefault("global_thresholds", {})
     thresholds["min_cognitive_threshold"] = value
-    policy_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    policy_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
     print(f"Updated min_cognitive_threshold to {value}")
     return 0
 
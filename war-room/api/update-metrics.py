@@ -4,46 +4,194 @@ AI-ULU War Room Dashboard - Metrics Updater
 Updates dashboard metrics from GitHub API and repository data
 """
 
-import json
 import os
-from datetime import datetime
-from github import Github
-
-def get_github_client():
-    """Initialize GitHub client with token"""
-    token = os.getenv('GITHUB_TOKEN') or os.getenv('GH_TOKEN')
-    if not token:
-        return None
-    return Github(token)
-
-def calculate_aor(repos):
-    """Calculate Autonomous Operation Rate"""
-    # Simplified calculation - in production, this would analyze CI/CD success rates
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+ETAG_CACHE_PATH = os.path.join('war-room', 'data', 'etag_cache.json')
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+REST_URL = 'https://api.github.com'
+
+# The only repo fields the dashboard reads; everything else in the REST payload is dropped
+REPO_FIELDS = ('name', 'updated_at', 'stargazers_count', 'forks_count', 'has_wiki', 'has_issues', 'private')
+
+def _new_session():
+    """Keep-alive pool with the headers every GitHub call shares (requests decodes gzip bodies itself)"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    session.headers.update({'Accept': 'application/vnd.github+json', 'Accept-Encoding': 'gzip'})
+    return session
+
+# REST listing on the main thread; the GraphQL query runs on a worker thread with its own
+# session, since requests.Session is not thread-safe
+SESSION = _new_session()
+GRAPHQL_SESSION = _new_session()
+GITHUB_ACTIONS_APP_ID = 15368
+
+# Agent signature in a commit message -> activity icon and text template
+_AGENT_RE = re.compile(r'(repair-agent|media-agent)', re.IGNORECASE)
+AGENT_ACTIVITY = {
+    'repair-agent': ('[REPAIR]', 'Repair Agent: Fixed issue in {}'),
+    'media-agent': ('[MEDIA]', 'Media Agent: Generated content for {}'),
+}
+
+# Per repo: last 10 default-branch commits with their GitHub Actions check suites
+REPO_ACTIVITY_QUERY = """
+query($org: String!, $cursor: String, $actionsApp: Int!) {
+  organization(login: $org) {
+    repositories(first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: 10) {
+                nodes {
+                  message
+                  authoredDate
+                  checkSuites(first: 10, filterBy: {appId: $actionsApp}) { nodes { conclusion } }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def get_github_token():
+    """GitHub token from the environment"""
+    return os.getenv('GITHUB_TOKEN') or os.getenv('GH_TOKEN')
+
+def authorize_session(token):
+    """Attach the token to both sessions once instead of building auth headers per request"""
+    for session in (SESSION, GRAPHQL_SESSION):
+        session.headers['Authorization'] = f'bearer {token}'
+
+def fetch_repo_activity(org='ai-ulu'):
+    """Recent commits and CI conclusions for every org repo, one GraphQL request per 100 repos"""
+    activity = {}
+    cursor = None
+    while True:
+        response = GRAPHQL_SESSION.post(GRAPHQL_URL, timeout=30, json={
+            'query': REPO_ACTIVITY_QUERY,
+            'variables': {'org': org, 'cursor': cursor, 'actionsApp': GITHUB_ACTIONS_APP_ID},
+        })
+        response.raise_for_status()
+        payload = orjson.loads(response.content)
+        if payload.get('errors'):
+            raise ValueError(payload['errors'][0].get('message', 'GraphQL error'))
+
+        repositories = payload['data']['organization']['repositories']
+        for node in repositories['nodes']:
+            target = (node.get('defaultBranchRef') or {}).get('target') or {}
+            history = (target.get('history') or {}).get('nodes', [])
+            activity[node['name']] = {
+                'commits': [{'message': c['message'], 'date': c['authoredDate']} for c in history[:3]],
+                'conclusions': [
+                    suite['conclusion'] for c in history for suite in c['checkSuites']['nodes']
+                ],
+            }
+
+        if not repositories['pageInfo']['hasNextPage']:
+            return activity
+        cursor = repositories['pageInfo']['endCursor']
+
+def atomic_write_json(path, obj):
+    """Serialize once, write with a single os.write to a temp file, then swap it into place"""
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    tmp = path + '.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+def load_etag_cache():
+    """Load {url: {etag, next, body}} from the conditional-request cache"""
+    if not os.path.exists(ETAG_CACHE_PATH):
+        return {}
+    try:
+        with open(ETAG_CACHE_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def save_etag_cache(cache):
+    """Persist the conditional-request cache"""
+    atomic_write_json(ETAG_CACHE_PATH, cache)
+
+def _list_repos_lean(etag_cache, org='ai-ulu'):
+    """List org repos as plain dicts holding only REPO_FIELDS, reusing 304-cached pages"""
+    repos = []
+    url = f'{REST_URL}/orgs/{org}/repos?per_page=100'
+    while url:
+        entry = etag_cache.get(url)
+        headers = {'If-None-Match': entry['etag']} if entry else None
+
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if entry and response.status_code == 304:
+            page, next_url = entry['body'], entry.get('next')
+        else:
+            response.raise_for_status()
+            page = [{key: repo.get(key) for key in REPO_FIELDS} for repo in orjson.loads(response.content)]
+            next_url = response.links.get('next', {}).get('url')
+            if response.headers.get('ETag'):
+                etag_cache[url] = {'etag': response.headers['ETag'], 'next': next_url, 'body': page}
+
+        repos.extend(page)
+        url = next_url
+
+    # Copies, so the cached pages keep their JSON-safe ISO strings
+    return [
+        dict(repo, updated_at=datetime.fromisoformat(repo['updated_at'].replace('Z', '+00:00')) if repo.get('updated_at') else None)
+        for repo in repos
+    ]
+
+def calculate_aor(activity):
+    """Calculate Autonomous Operation Rate from recent GitHub Actions conclusions"""
     total_workflows = 0
     successful_workflows = 0
     
-    for repo in repos:
-        try:
-            workflows = repo.get_workflows()
-            for workflow in workflows:
-                runs = workflow.get_runs()[:10]  # Last 10 runs
-                total_workflows += len(list(runs))
-                successful_workflows += sum(1 for run in runs if run.conclusion == 'success')
-        except:
-            pass
+    for repo_activity in activity.values():
+        # Suites still running have no conclusion yet
+        conclusions = [c for c in repo_activity['conclusions'] if c is not None]
+        total_workflows += len(conclusions)
+        successful_workflows += sum(1 for c in conclusions if c == 'SUCCESS')
     
     if total_workflows == 0:
         return 92.5  # Fallback
     
     return round((successful_workflows / total_workflows) * 100, 1)
 
+@lru_cache(maxsize=8)
+def _read_json(path, mtime_ns, size):
+    """Parse a JSON file; mtime/size are part of the cache key so edits invalidate it"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def read_json_cached(path):
+    """Parsed JSON for path, re-read only when the file changed (treat as read-only)"""
+    st = os.stat(path)
+    return _read_json(path, st.st_mtime_ns, st.st_size)
+
 def load_agent_memory():
     """Load agent memory metrics from war-room/data/agent_memory.json"""
     path = os.path.join("war-room", "data", "agent_memory.json")
     if not os.path.exists(path):
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_json_cached(path)
 
 def calculate_rsi_from_memory(memory):
     """Calculate RSI from recent ops with recovery bonus"""
@@ -70,38 +218,26 @@ def calculate_mttr_from_memory(memory):
         return 0.0
     return round(total_time / repairs, 2)
 
-def get_active_repos_count(repos):
-    """Count active public repositories (updated in last 30 days)"""
-    from datetime import timedelta
-    cutoff = datetime.now() - timedelta(days=30)
-    
-    active = sum(1 for repo in repos if repo.updated_at > cutoff)
+def get_active_repos_count(repos, cutoff):
+    """Count active public repositories (updated since cutoff, i.e. last 30 days)"""
+    active = sum(1 for repo in repos if repo['updated_at'] and repo['updated_at'] > cutoff)
     return active
 
-def get_agent_activities(repos):
+def get_agent_activities(repos, activity, now):
     """Get recent agent activities from commit messages and issues"""
     activities = []
     
     # Look for recent commits with agent signatures
     for repo in repos[:5]:  # Check first 5 repos
-        try:
-            commits = repo.get_commits()[:3]
-            for commit in commits:
-                message = commit.commit.message
-                if 'repair-agent' in message.lower():
-                    activities.append({
-                        'icon': '[REPAIR]',
-                        'text': f'Repair Agent: Fixed issue in {repo.name}',
-                        'time': get_relative_time(commit.commit.author.date)
-                    })
-                elif 'media-agent' in message.lower():
-                    activities.append({
-                        'icon': '[MEDIA]',
-                        'text': f'Media Agent: Generated content for {repo.name}',
-                        'time': get_relative_time(commit.commit.author.date)
-                    })
-        except:
-            pass
+        for commit in activity.get(repo['name'], {}).get('commits', []):
+            match = _AGENT_RE.search(commit['message'])
+            if match:
+                icon, text = AGENT_ACTIVITY[match.group(1).lower()]
+                activities.append({
+                    'icon': icon,
+                    'text': text.format(repo['name']),
+                    'time': get_relative_time(datetime.fromisoformat(commit['date'].replace('Z', '+00:00')), now)
+                })
     
     # Add default activities if none found
     if not activities:
@@ -125,9 +261,8 @@ def get_agent_activities(repos):
     
     return activities[:10]
 
-def get_relative_time(dt):
-    """Convert datetime to relative time string"""
-    now = datetime.now(dt.tzinfo)
+def get_relative_time(dt, now):
+    """Convert datetime to relative time string as of now"""
     diff = now - dt
     
     if diff.seconds < 60:
@@ -139,66 +274,132 @@ def get_relative_time(dt):
     else:
         return f'{diff.days} days ago'
 
-def calculate_repo_aura(repo):
+def calculate_repo_aura(repo, recent_cutoff):
     """Calculate Aura score for a repository"""
     score = 50  # Base score
     
     # Factors that increase aura
-    if repo.stargazers_count > 10:
-        score += min(20, repo.stargazers_count)
-    if repo.forks_count > 5:
-        score += min(10, repo.forks_count * 2)
-    if repo.has_wiki:
+    if repo['stargazers_count'] > 10:
+        score += min(20, repo['stargazers_count'])
+    if repo['forks_count'] > 5:
+        score += min(10, repo['forks_count'] * 2)
+    if repo['has_wiki']:
         score += 5
-    if repo.has_issues:
+    if repo['has_issues']:
         score += 5
     
-    # Recent activity
-    from datetime import timedelta
-    if repo.updated_at > datetime.now() - timedelta(days=7):
+    # Recent activity (last 7 days)
+    if repo['updated_at'] and repo['updated_at'] > recent_cutoff:
         score += 10
     
     return min(100, score)
 
+# Aura thresholds, highest first; _HEALTH_LUT precomputes them for every integer score
+_HEALTH_BANDS = ((90, 'excellent'), (75, 'good'), (60, 'fair'))
+
+def _health_for(aura):
+    return next((name for threshold, name in _HEALTH_BANDS if aura >= threshold), 'poor')
+
+_HEALTH_LUT = tuple(_health_for(score) for score in range(101))
+
 def get_repo_health(aura):
     """Determine health status from aura score"""
-    if aura >= 90:
-        return 'excellent'
-    elif aura >= 75:
-        return 'good'
-    elif aura >= 60:
-        return 'fair'
-    else:
-        return 'poor'
+    if 0 <= aura <= 100:
+        return _HEALTH_LUT[int(aura)]
+    return _health_for(aura)
 
-def build_repo_data(public_repos):
+def build_repo_data(public_repos, recent_cutoff):
     """Build repo data payloads for repos.json"""
     repo_data = []
     for repo in public_repos:
-        aura = calculate_repo_aura(repo)
+        aura = calculate_repo_aura(repo, recent_cutoff)
         repo_data.append(
             {
-                'name': repo.name,
+                'name': repo['name'],
                 'aura': aura,
                 'health': get_repo_health(aura),
                 'category': 'unicorn' if aura >= 90 else 'muscle',
-                'updated_at': repo.updated_at.isoformat() if repo.updated_at else None,
-                'stars': repo.stargazers_count,
+                'updated_at': repo['updated_at'].isoformat() if repo['updated_at'] else None,
+                'stars': repo['stargazers_count'],
             }
         )
     return repo_data
 
+# Strategic advice engine (V2)
+SUGGESTIONS = [
+    {
+        "id": "market_analyser",
+        "en": "System strong. Next move: launch 'ulu-market-analyser' to track external trends.",
+        "tr": "Sistem guclu. Siradaki hamle: dis trendleri izlemek icin 'ulu-market-analyser' reposu ac.",
+    },
+    {
+        "id": "cognitive_high",
+        "en": "Cognitive threshold is high. Perfecting analysis boosts safety but may slow execution. Ideal for critical expansion.",
+        "tr": "Bilissel esik yuksek. Derin analiz guvenligi artirir ama hiz dusurebilir. Kritik genisleme icin ideal.",
+    },
+    {
+        "id": "cognitive_low",
+        "en": "Cognitive threshold is low. Fast execution is enabled, but strategic risk increases. Use for routine ops only.",
+        "tr": "Bilissel esik dusuk. Hizli islem modu acik, ancak stratejik risk artar. Sadece rutin islerde kullan.",
+    },
+    {
+        "id": "docs_automation",
+        "en": "Repo mix is unbalanced. Recommend 'ulu-docs-automation' to reduce docs load.",
+        "tr": "Repo dagilimi dengesiz. Dokumantasyon yukunu azaltmak icin 'ulu-docs-automation' onerilir.",
+    },
+    {
+        "id": "api_gateway",
+        "en": "Aura is rising. Build 'ulu-api-gateway' to open the ecosystem to third parties.",
+        "tr": "Aura yukseliyor. Ekosistemi disari acmak icin 'ulu-api-gateway' kur.",
+    },
+    {
+        "id": "quality_reinforcement",
+        "en": "RSI is low. Focus on quality and stabilize core repos before expansion.",
+        "tr": "RSI dusuk. Genislemeden once cekirdek repolari stabilize et.",
+    },
+]
+SUGGESTIONS_BY_ID = {s["id"]: s for s in SUGGESTIONS}
+
+def pick_advice(cognitive_threshold, rsi, rsi_threshold, archive_ratio, unicorn_ratio):
+    """Return the SUGGESTIONS id that fits the current thresholds and repo mix"""
+    if cognitive_threshold >= 75:
+        return "cognitive_high"
+    if cognitive_threshold <= 40:
+        return "cognitive_low"
+    if rsi < rsi_threshold:
+        return "quality_reinforcement"
+    if archive_ratio > 0.3:
+        return "docs_automation"
+    if unicorn_ratio >= 0.6:
+        return "api_gateway"
+    return "market_analyser"
+
 def main():
     print("Updating Updating War Room Dashboard metrics...")
     
+    # One as-of timestamp for the whole run
+    now = datetime.now(timezone.utc)
+    cutoff_30 = now - timedelta(days=30)
+    cutoff_7 = now - timedelta(days=7)
+    
     try:
-        gh = get_github_client()
+        token = get_github_token()
+        etag_cache = None
         repos = []
         public_repos = []
-        if gh:
-            org = gh.get_organization('ai-ulu')
-            repos = list(org.get_repos())
-            public_repos = [repo for repo in repos if not repo.private]
+        activity = {}
+        if token:
+            authorize_session(token)
+            etag_cache = load_etag_cache()
+            # The GraphQL activity query and the REST repo listing are independent; overlap them
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                activity_future = pool.submit(fetch_repo_activity)
+                repos = _list_repos_lean(etag_cache)
+                try:
+                    activity = activity_future.result()
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print(f"Warning: GraphQL activity query failed ({e}); using fallbacks")
+            public_repos = [repo for repo in repos if not repo['private']]
         total_repos = len(repos)
         public_count = len(public_repos)
         private_count = max(0, total_repos - public_count)
@@ -212,10 +413,10 @@ def main():
         panic_resolved = int(stats.get("panic_resolved", 0))
 
         # Calculate metrics
-        aor = calculate_aor(repos)
+        aor = calculate_aor(activity)
         rsi = calculate_rsi_from_memory(memory)
         mttr = calculate_mttr_from_memory(memory)
-        active_repos = get_active_repos_count(public_repos)
+        active_repos = get_active_repos_count(public_repos, cutoff_30)
         
         # Update metrics.json
         metrics = {
@@ -232,28 +433,28 @@ def main():
             'chaos_success': f"{round((panic_resolved / panic_count) * 100, 2)}%" if panic_count > 0 else "0%",
             'chaos_scenarios': panic_count,
             'valuation_multiplier': '1.5x (Automation Premium)',
-            'last_sync': datetime.now().isoformat()
+            'last_sync': now.isoformat()
         }
         
-        with open('war-room/data/metrics.json', 'w') as f:
-            json.dump(metrics, f, indent=2)
+        atomic_write_json('war-room/data/metrics.json', metrics)
         
         print(f"OK Metrics updated: AOR={aor}%, RSI={rsi}%, MTTR={mttr}m")
         
         # Update agent-log.json
-        activities = get_agent_activities(repos)
+        activities = get_agent_activities(repos, activity, now)
+        if etag_cache is not None:
+            save_etag_cache(etag_cache)
         agent_log = {
             'activities': activities,
-            'last_update': datetime.now().isoformat()
+            'last_update': now.isoformat()
         }
         
-        with open('war-room/data/agent-log.json', 'w') as f:
-            json.dump(agent_log, f, indent=2)
+        atomic_write_json('war-room/data/agent-log.json', agent_log)
         
         print(f"OK Agent log updated with {len(activities)} activities")
         
         # Update repos.json (safe-fail if no API data)
-        repo_data = build_repo_data(public_repos)
+        repo_data = build_repo_data(public_repos, cutoff_7)
 
         if not repo_data:
             print("Warning: no repo data from API; keeping existing repos.json")
@@ -261,36 +462,36 @@ def main():
             repos_json = {
                 'repositories': sorted(repo_data, key=lambda x: x['aura'], reverse=True),
                 'total_count': len(repo_data),
-                'last_update': datetime.now().isoformat()
+                'last_update': now.isoformat()
             }
 
-            with open('war-room/data/repos.json', 'w') as f:
-                json.dump(repos_json, f, indent=2)
+            atomic_write_json('war-room/data/repos.json', repos_json)
 
         # Update dashboard_data.json (policy + repo aggregation)
         policy_path = os.path.join('war-room', 'data', 'policy.json')
         policy = {}
         if os.path.exists(policy_path):
-            with open(policy_path, 'r', encoding='utf-8') as pf:
-                policy = json.load(pf)
+            policy = read_json_cached(policy_path)
 
-        class_counts = {'unicorn': 0, 'muscle': 0, 'archive': 0}
-        class_aura = {'unicorn': [], 'muscle': [], 'archive': []}
+        # Normalize (short name, class) once per policy entry
+        policy_items = [
+            (full.split('/')[-1], (meta.get('class') or 'muscle').lower())
+            for full, meta in policy.get('repositories', {}).items()
+        ]
+        class_counts = Counter({'unicorn': 0, 'muscle': 0, 'archive': 0})
+        class_aura = defaultdict(list, {'unicorn': [], 'muscle': [], 'archive': []})
 
         # Prefer existing repos.json if API data is empty
         repos_source = repo_data
         if not repos_source:
             try:
-                with open('war-room/data/repos.json', 'r') as rf:
-                    repos_source = json.load(rf).get('repositories', [])
-            except (OSError, json.JSONDecodeError):
+                repos_source = read_json_cached('war-room/data/repos.json').get('repositories', [])
+            except (OSError, orjson.JSONDecodeError):
                 repos_source = []
         repos_by_name = {r.get('name'): r for r in repos_source}
 
-        for full, meta in policy.get('repositories', {}).items():
-            repo_class = (meta.get('class') or 'muscle').lower()
-            class_counts[repo_class] = class_counts.get(repo_class, 0) + 1
-            name = full.split('/')[-1]
+        for name, repo_class in policy_items:
+            class_counts[repo_class] += 1
             aura = repos_by_name.get(name, {}).get('aura')
             if aura is not None:
                 class_aura[repo_class].append(aura)
@@ -298,67 +499,21 @@ def main():
         def avg(values):
             return round(sum(values) / len(values), 2) if values else 0
 
-        # Strategic advice engine (V2)
-        suggestions = [
-            {
-                "id": "market_analyser",
-                "en": "System strong. Next move: launch 'ulu-market-analyser' to track external trends.",
-                "tr": "Sistem guclu. Siradaki hamle: dis trendleri izlemek icin 'ulu-market-analyser' reposu ac.",
-            },
-            {
-                "id": "cognitive_high",
-                "en": "Cognitive threshold is high. Perfecting analysis boosts safety but may slow execution. Ideal for critical expansion.",
-                "tr": "Bilissel esik yuksek. Derin analiz guvenligi artirir ama hiz dusurebilir. Kritik genisleme icin ideal.",
-            },
-            {
-                "id": "cognitive_low",
-                "en": "Cognitive threshold is low. Fast execution is enabled, but strategic risk increases. Use for routine ops only.",
-                "tr": "Bilissel esik dusuk. Hizli islem modu acik, ancak stratejik risk artar. Sadece rutin islerde kullan.",
-            },
-            {
-                "id": "docs_automation",
-                "en": "Repo mix is unbalanced. Recommend 'ulu-docs-automation' to reduce docs load.",
-                "tr": "Repo dagilimi dengesiz. Dokumantasyon yukunu azaltmak icin 'ulu-docs-automation' onerilir.",
-            },
-            {
-                "id": "api_gateway",
-                "en": "Aura is rising. Build 'ulu-api-gateway' to open the ecosystem to third parties.",
-                "tr": "Aura yukseliyor. Ekosistemi disari acmak icin 'ulu-api-gateway' kur.",
-            },
-            {
-                "id": "quality_reinforcement",
-                "en": "RSI is low. Focus on quality and stabilize core repos before expansion.",
-                "tr": "RSI dusuk. Genislemeden once cekirdek repolari stabilize et.",
-            },
-        ]
-        suggestions_by_id = {s["id"]: s for s in suggestions}
-
         total = max(1, sum(class_counts.values()))
         unicorn_ratio = class_counts.get('unicorn', 0) / total
         archive_ratio = class_counts.get('archive', 0) / total
         cognitive_threshold = float(policy.get('global_thresholds', {}).get('min_cognitive_threshold', 50))
 
-        if cognitive_threshold >= 75:
-            advice_pick = suggestions_by_id["cognitive_high"]
-        elif cognitive_threshold <= 40:
-            advice_pick = suggestions_by_id["cognitive_low"]
-        elif rsi < float(policy.get('global_thresholds', {}).get('rsi_pause_chaos_below', 95)):
-            advice_pick = suggestions_by_id["quality_reinforcement"]
-        elif archive_ratio > 0.3:
-            advice_pick = suggestions_by_id["docs_automation"]
-        elif unicorn_ratio >= 0.6:
-            advice_pick = suggestions_by_id["api_gateway"]
-        else:
-            advice_pick = suggestions_by_id["market_analyser"]
+        rsi_threshold = float(policy.get('global_thresholds', {}).get('rsi_pause_chaos_below', 95))
+        advice_pick = SUGGESTIONS_BY_ID[pick_advice(cognitive_threshold, rsi, rsi_threshold, archive_ratio, unicorn_ratio)]
 
         # Cortex metrics
         cortex_path = os.path.join('war-room', 'data', 'cortex_log.json')
         cortex_entries = []
         if os.path.exists(cortex_path):
             try:
-                with open(cortex_path, 'r', encoding='utf-8') as cf:
-                    cortex_entries = json.load(cf).get('entries', [])
-            except (OSError, json.JSONDecodeError):
+                cortex_entries = read_json_cached(cortex_path).get('entries', [])
+            except (OSError, orjson.JSONDecodeError):
                 cortex_entries = []
 
         recent_scores = [e.get('score', 0) for e in cortex_entries[:10] if isinstance(e.get('score', 0), (int, float))]
@@ -384,11 +539,10 @@ def main():
             'cognitive_depth': cognitive_depth,
             'cortex_recent': cortex_tail,
             'cognitive_threshold': cognitive_threshold,
-            'policy_last_update': datetime.now().isoformat()
+            'policy_last_update': now.isoformat()
         }
 
-        with open('war-room/data/dashboard_data.json', 'w') as f:
-            json.dump(dashboard_data, f, indent=2)
+        atomic_write_json('war-room/data/dashboard_data.json', dashboard_data)
         
         print(f"OK Repository data updated for {len(repo_data)} repos")
         print("Done Dashboard metrics update complete!")
@@ -10,10 +10,13 @@ class NeuralLinkClient {
         this.connected = false;
         this.reconnectInterval = 3000;
         this.listeners = new Map();
+        this.decoder = new TextDecoder();
     }
 
     connect() {
         this.ws = new WebSocket(this.url);
+        // Sunucu olayları binary (UTF-8 JSON) frame olarak gönderir
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('🧠 Neural Link connected');
@@ -29,7 +32,8 @@ class NeuralLinkClient {
         };
 
         this.ws.onmessage = (event) => {
-            const data = JSON.parse(event.data);
+            const text = typeof event.data === 'string' ? event.data : this.decoder.decode(event.data);
+            const data = JSON.parse(text);
             this.handleMessage(data);
         };
 
@@ -47,7 +51,18 @@ class NeuralLinkClient {
     handleMessage(data) {
         const event = data.event;
 
+        // Sunucu kuyrukta biriken olayları tek frame'de gönderir
+        if (event === 'batch') {
+            data.items.forEach(item => this.handleMessage(item));
+            return;
+        }
+
         switch(event) {
+            case 'ping':
+                // Sunucu heartbeat'i; yanıt vermeyen bağlantılar kapatılır
+                this.send({ event: 'pong' });
+                break;
+
             case 'agent.activity':
                 this.onAgentActivity(data);
                 break;